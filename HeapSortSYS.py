@@ -1,111 +1,91 @@
-import sys
+import os
+import webbrowser
 import plotly.graph_objects as go
 import plotly.io as pio
-
-def heapify(arr, n, i, frames):
-    largest = i
-    l = 2 * i + 1
-    r = 2 * i + 2
-
-    if l < n and arr[l] > arr[largest]:
-        largest = l
-
-    if r < n and arr[r] > arr[largest]:
-        largest = r
-
-    if largest != i:
-        arr[i], arr[largest] = arr[largest], arr[i]
-        frames.append({
-            'arr': arr.copy(),
-            'stage': 'heapify',
-            'active': list(range(n)),
-            'current': i
-        })
-        heapify(arr, n, largest, frames)
-
-def heap_sort_with_animation(arr):
-    n = len(arr)
-    frames = [{'arr': arr.copy(), 'stage': 'initial', 'active': list(range(n))}]
-
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i, frames)
-
-    for i in range(n - 1, 0, -1):
-        arr[i], arr[0] = arr[0], arr[i]
-        frames.append({
-            'arr': arr.copy(),
-            'stage': 'extract',
-            'active': list(range(i)) + [i],
-            'current': 0
-        })
-        heapify(arr, i, 0, frames)
-    
-    return frames
-
-def create_animation(frames, output_file='heap_sort_animation.html'):
-    fig = go.Figure()
-    max_val = max(max(frame['arr']) for frame in frames)
-    
-    color_map = {
-        'default': 'rgb(173, 216, 230)',  # Light Blue
-        'active': 'rgb(144, 238, 144)',   # Light Green
-        'current': 'rgb(255, 99, 71)',    # Light Tomato
-        'extracted': 'rgb(255, 215, 0)'   # Light Golden Rod Yellow
-    }
-
-    def create_bar_trace(frame):
-        colors = [color_map['default'] for _ in frame['arr']]
-        for i in frame['active']:
-            colors[i] = color_map['active']
-        if frame['stage'] == 'extract':
-            for i in frame['active']:
-                colors[i] = color_map['extracted']
-        if 'current' in frame:
-            colors[frame['current']] = color_map['current']
-
-        return go.Bar(
-            x=list(range(len(frame['arr']))),
-            y=frame['arr'],
-            marker_color=colors,
-            text=[str(x) for x in frame['arr']],
-            textposition='outside',
-            hoverinfo='text'
-        )
-
-    fig.add_trace(create_bar_trace(frames[0]))
-    fig_frames = [go.Frame(data=[create_bar_trace(frame)], name=str(i)) for i, frame in enumerate(frames)]
-    fig.frames = fig_frames
-
-    fig.update_layout(
-        title='Animación de Heap Sort',
-        updatemenus=[dict(
-            type='buttons',
-            showactive=False,
-            buttons=[dict(label='Play',
-                          method='animate',
-                          args=[None, dict(frame=dict(duration=500, redraw=True),
-                                           fromcurrent=True,
-                                           mode='immediate')])],
-        )],
-        height=600
-    )
-
-    fig.update_xaxes(title_text='Índice')
-    fig.update_yaxes(range=[0, max_val * 1.1], title_text='Valor')
-    pio.write_html(fig, file=output_file, auto_open=True, auto_play=False)
+from fastfig import write_html
+from plotlyasset import plotlyjs_include
+from rendercache import cache_key, get_cache
+from heapcore import iter_heap_sort_frames, max_value, sift_down
+from heapplot import (animation_figure_dict, animation_layout, create_animation_canvas,
+                      create_animation_stream, create_bar_trace, heap_sort_with_animation)
+from sortstats import SortStats, phase, stats_enabled
+
+def heapify(arr, n, i, trace=None):
+    # trace: HeapTrace opcional donde se registran los intercambios
+    sift_down(arr, n, i, trace)
+
+def create_animation(frames, output_file='heap_sort_animation.html', fast=False, stats=None):
+    with phase(stats, 'render'):
+        if fast:
+            write_html(animation_figure_dict(frames), output_file,
+                       include_plotlyjs=plotlyjs_include(output_file), auto_open=True, auto_play=False)
+        else:
+            fig = go.Figure()
+            max_val = max_value(frames)  # incluye los valores de eventos 'insert' (top_k)
+
+            fig.add_trace(create_bar_trace(frames[0]))
+            fig_frames = [go.Frame(data=[create_bar_trace(frame)], name=str(i)) for i, frame in enumerate(frames)]
+            fig.frames = fig_frames
+
+            fig.update_layout(animation_layout(max_val))
+            pio.write_html(fig, file=output_file, include_plotlyjs=plotlyjs_include(output_file),
+                           auto_open=True, auto_play=False)
     print(f"La animación ha sido guardada en {output_file}")
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python script.py 10 5 8 3 6 ...")
-        sys.exit(1)
-
-    try:
-        arr = [int(x) for x in sys.argv[1:]]
-    except ValueError:
-        print("Error: Todos los valores deben ser números enteros.")
-        sys.exit(1)
+def create_animation_cached(arr, output_file='heap_sort_animation.html', fast=False, stats=None,
+                            max_frames=None):
+    # Si este mismo array ya se renderizó (ver rendercache), se reutiliza el
+    # HTML sin volver a ordenar ni a construir la figura. Solo con la capa en
+    # disco (RENDER_CACHE_DIR): en un proceso de una sola animación la capa
+    # en memoria nunca acierta y releer el HTML solo añadiria trabajo
+    cache = get_cache()
+    if cache.directory is None:
+        frames = heap_sort_with_animation(list(arr), stats=stats, max_frames=max_frames)
+        create_animation(frames, output_file, fast=fast, stats=stats)
+        return
+
+    key = cache_key('HeapSortSYS', arr, {'fast': fast, 'max_frames': max_frames,
+                                         'plotlyjs': plotlyjs_include(output_file)})
+    html = cache.get(key)
+    if html is not None:
+        with open(output_file, 'wb') as fp:
+            fp.write(html)
+        print(f"La animación ha sido guardada en {output_file}")
+        # Igual que write_html(..., auto_open=True) al renderizar
+        webbrowser.open('file://' + os.path.realpath(output_file))
+        return
+
+    frames = heap_sort_with_animation(list(arr), stats=stats, max_frames=max_frames)
+    create_animation(frames, output_file, fast=fast, stats=stats)
+    with open(output_file, 'rb') as fp:
+        cache.put(key, fp.read())
 
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Animación de Heap Sort para un array dado")
+    parser.add_argument('arr', nargs='+', type=int, metavar='N', help="Valores enteros del array")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--stream', action='store_true',
+                      help="Escribir el HTML frame a frame, sin tener todos en memoria")
+    mode.add_argument('--canvas', action='store_true',
+                      help="Reproductor de canvas con la traza completa")
+    parser.add_argument('--max-frames', type=int, default=None,
+                        help="Muestrear los frames para que el HTML no crezca con cada swap")
+    args = parser.parse_intermixed_args()
+    if args.max_frames is not None and (args.stream or args.canvas):
+        parser.error("--max-frames no se puede usar con --stream ni con --canvas")
+    arr, stream, canvas, max_frames = args.arr, args.stream, args.canvas, args.max_frames
+
+    stats = SortStats('HeapSortSYS') if stats_enabled() else None
     print(f"Array ingresado: {arr}")
-    frames = heap_sort_with_animation(arr)
-    create_animation(frames)
+    if stream:
+        with phase(stats, 'render'):
+            create_animation_stream(iter_heap_sort_frames(arr))
+    elif canvas:
+        create_animation_canvas(heap_sort_with_animation(arr, stats=stats), stats=stats)
+    else:
+        create_animation_cached(arr, stats=stats, max_frames=max_frames)
+    if stats is not None:
+        stats.cache = get_cache().stats()
+        stats.emit()
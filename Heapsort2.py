@@ -1,73 +1,389 @@
 import sys
-import plotly.graph_objects as go
+import os
 import json
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from animstream import write_json_array
+from heapcore import heap_sort_session, iter_heap_sort_frames, sift_down
+from heapplot import heap_sort_with_animation as _heap_sort_with_animation
+from keyframes import json_size
+from rendercache import cache_key, get_cache
+from sortstats import SortStats, phase, stats_enabled
 
-def heapify(arr, n, i, frames):
-    largest = i
-    l = 2 * i + 1
-    r = 2 * i + 2
-
-    if l < n and arr[l] > arr[largest]:
-        largest = l
-
-    if r < n and arr[r] > arr[largest]:
-        largest = r
-
-    if largest != i:
-        arr[i], arr[largest] = arr[largest], arr[i]
-        frames.append({'arr': arr.copy(), 'stage': 'heapify', 'active': list(range(n)), 'current': i})
-        heapify(arr, n, largest, frames)
-
-def heap_sort_with_animation(arr):
-    n = len(arr)
-    frames = [{'arr': arr.copy(), 'stage': 'initial', 'active': list(range(n))}]
-
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i, frames)
-
-    for i in range(n - 1, 0, -1):
-        arr[i], arr[0] = arr[0], arr[i]
-        frames.append({'arr': arr.copy(), 'stage': 'extract', 'active': list(range(i)), 'current': 0})
-        heapify(arr, i, 0, frames)
-    
-    return frames
-
-def generate_animation_data(frames):
-    color_map = {
-        'default': 'rgb(173, 216, 230)',
-        'active': 'rgb(144, 238, 144)',
-        'current': 'rgb(255, 99, 71)',
-        'extracted': 'rgb(255, 215, 0)'
+def heapify(arr, n, i, trace=None):
+    # trace: HeapTrace opcional donde se registran los intercambios
+    sift_down(arr, n, i, trace)
+
+def heap_sort_with_animation(arr, stats=None, max_frames=None, max_bytes=None, sampling='uniform'):
+    # heapplot.heap_sort_with_animation con los frames de este script: sin
+    # marcar los extraidos y medidos con el JSON de frame_data
+    return _heap_sort_with_animation(arr, stats, max_frames, max_bytes, sampling,
+                                     mark_extracted=False,
+                                     frame_size=lambda frame: json_size(frame_data(frame)))
+
+COLOR_MAP = {
+    'default': 'rgb(173, 216, 230)',
+    'active': 'rgb(144, 238, 144)',
+    'current': 'rgb(255, 99, 71)',
+    'extracted': 'rgb(255, 215, 0)'
+}
+# Paleta compartida de los formatos compactos: el color se envia como indice
+PALETTE = list(COLOR_MAP.values())
+COLOR_CODES = {name: code for code, name in enumerate(COLOR_MAP)}
+
+BINARY_MAGIC = b'HSA\x01'
+
+def frame_color_codes(frame):
+    codes = [COLOR_CODES['default']] * len(frame['arr'])
+    for i in frame['active']:
+        codes[i] = COLOR_CODES['active']
+    if 'current' in frame:
+        codes[frame['current']] = COLOR_CODES['current']
+    return codes
+
+def generate_animation_data(frames, format='json', stats=None):
+    # format: 'json' (por defecto), 'compact' (paleta + deltas) o 'binary'
+    if format not in ('json', 'compact', 'binary'):
+        raise ValueError(f"Formato desconocido: {format}")
+    with phase(stats, 'serialize'):
+        if format == 'compact':
+            return json.dumps(compact_animation_data(frames), separators=(',', ':'))
+        if format == 'binary':
+            return binary_animation_data(frames)
+
+        data_frames = [frame_data(frame) for frame in frames]
+        return json.dumps(data_frames)
+
+def frame_data(frame):
+    colors = [PALETTE[code] for code in frame_color_codes(frame)]
+    return {
+        'x': list(range(len(frame['arr']))),
+        'y': frame['arr'],
+        'colors': colors
     }
 
-    data_frames = []
+def write_animation_data(frames, fp):
+    # Version en streaming de generate_animation_data (formato json): escribe
+    # cada frame en fp en cuanto llega; la salida es identica byte a byte
+    write_json_array((frame_data(frame) for frame in frames), fp)
+
+def iter_frame_deltas(frames):
+    # Devuelve (y, codes) del primer frame y luego, por frame, los cambios
+    # respecto al anterior como listas de (indice, valor) y (indice, codigo)
+    prev_y = prev_codes = None
     for frame in frames:
-        colors = [color_map['default']] * len(frame['arr'])
-        for i in frame['active']:
-            colors[i] = color_map['active']
-        if 'current' in frame:
-            colors[frame['current']] = color_map['current']
+        y = [int(v) for v in frame['arr']]
+        codes = frame_color_codes(frame)
+        if prev_y is None:
+            yield y, codes
+        else:
+            yield ([(i, v) for i, (v, p) in enumerate(zip(y, prev_y)) if v != p],
+                   [(i, c) for i, (c, p) in enumerate(zip(codes, prev_codes)) if c != p])
+        prev_y, prev_codes = y, codes
 
+def compact_animation_data(frames):
+    deltas = iter_frame_deltas(frames)
+    y, codes = next(deltas)
+    data_frames = []
+    for dy, dc in deltas:
         data_frames.append({
-            'x': list(range(len(frame['arr']))),
-            'y': frame['arr'],
-            'colors': colors
+            'dy': [k for pair in dy for k in pair],
+            'dc': [k for pair in dc for k in pair]
         })
+    return {'palette': PALETTE, 'x': list(range(len(y))), 'y': y, 'c': codes,
+            'frames': data_frames}
+
+def _smallest_format(values, formats):
+    lo, hi = min(values, default=0), max(values, default=0)
+    for fmt in formats:
+        bits = 8 * struct.calcsize(fmt)
+        if fmt.isupper():
+            if lo >= 0 and hi < 2 ** bits:
+                return fmt
+        elif -2 ** (bits - 1) <= lo and hi < 2 ** (bits - 1):
+            return fmt
+    raise ValueError("Valores fuera de rango para el formato binario")
+
+def binary_animation_data(frames):
+    # Cabecera: magic, n y numero de frames (uint32), tipo de los valores y de
+    # los indices (1 caracter struct cada uno, el mas pequeño que sirva) y la
+    # paleta en JSON (uint16 de longitud + bytes). Luego el primer frame
+    # completo (n valores + n codigos uint8) y, por cada frame siguiente, los
+    # deltas: uint32 k, k indices, k valores, uint32 m, m indices, m uint8.
+    # Todo little-endian.
+    deltas = iter_frame_deltas(frames)
+    y, codes = next(deltas)
+    n = len(y)
+    value_fmt = _smallest_format(y, 'bhiq')
+    index_fmt = _smallest_format([n], 'BHI')
+    body = [struct.pack(f'<{n}{value_fmt}', *y), bytes(codes)]
+    num_frames = 1
+    for dy, dc in deltas:
+        num_frames += 1
+        for pairs, fmt in ((dy, value_fmt), (dc, 'B')):
+            k = len(pairs)
+            body.append(struct.pack('<I', k))
+            body.append(struct.pack(f'<{k}{index_fmt}', *(i for i, _ in pairs)))
+            body.append(struct.pack(f'<{k}{fmt}', *(v for _, v in pairs)))
+    palette = json.dumps(PALETTE).encode('utf-8')
+    header = BINARY_MAGIC + struct.pack('<IIccH', n, num_frames, value_fmt.encode(),
+                                        index_fmt.encode(), len(palette))
+    return header + palette + b''.join(body)
+
+def decode_binary_animation_data(payload):
+    # Inverso de binary_animation_data; devuelve la misma estructura que
+    # compact_animation_data (util para validar el formato en el servidor)
+    if payload[:4] != BINARY_MAGIC:
+        raise ValueError("Cabecera binaria inválida")
+    n, num_frames, value_fmt, index_fmt, palette_len = struct.unpack_from('<IIccH', payload, 4)
+    value_fmt, index_fmt = value_fmt.decode(), index_fmt.decode()
+    offset = 4 + struct.calcsize('<IIccH')
+    palette = json.loads(payload[offset:offset + palette_len])
+    offset += palette_len
+    y = list(struct.unpack_from(f'<{n}{value_fmt}', payload, offset))
+    offset += struct.calcsize(f'<{n}{value_fmt}')
+    codes = list(payload[offset:offset + n])
+    offset += n
+
+    data_frames = []
+    for _ in range(num_frames - 1):
+        frame = {}
+        for key, fmt in (('dy', value_fmt), ('dc', 'B')):
+            k, = struct.unpack_from('<I', payload, offset)
+            offset += 4
+            idx = struct.unpack_from(f'<{k}{index_fmt}', payload, offset)
+            offset += struct.calcsize(f'<{k}{index_fmt}')
+            values = struct.unpack_from(f'<{k}{fmt}', payload, offset)
+            offset += struct.calcsize(f'<{k}{fmt}')
+            frame[key] = [x for pair in zip(idx, values) for x in pair]
+        data_frames.append(frame)
+    return {'palette': palette, 'x': list(range(n)), 'y': y, 'c': codes,
+            'frames': data_frames}
+
+def cached_animation_data(arr, data_format='json', stats=None, max_frames=None, max_bytes=None):
+    # Devuelve (datos, acierto): los datos salen de la cache de render si
+    # esta misma entrada ya se proceso (ver rendercache.get_cache). Con
+    # max_frames / max_bytes solo se serializa una muestra de los frames
+    cache = get_cache()
+    params = {'format': data_format}
+    if max_frames is not None or max_bytes is not None:
+        params.update(max_frames=max_frames, max_bytes=max_bytes)
+    key = cache_key('Heapsort2', arr, params)
+    with phase(stats, 'cache'):
+        data = cache.get(key)
+    if data is not None:
+        return (data if data_format == 'binary' else data.decode('utf-8')), True
+
+    frames = heap_sort_with_animation(arr, stats=stats, max_frames=max_frames, max_bytes=max_bytes)
+    data = generate_animation_data(frames, format=data_format, stats=stats)
+    cache.put(key, data if data_format == 'binary' else data.encode('utf-8'))
+    return data, False
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+def _int_list(values, name='arr', data_format='json'):
+    # Valida una lista JSON de enteros: int(x) aceptaria "321" (como lista de
+    # caracteres), true o 1.7 (truncado). El formato binario solo admite
+    # valores de 64 bits (ver _smallest_format)
+    if not isinstance(values, list) or not all(
+            isinstance(x, int) and not isinstance(x, bool) for x in values):
+        raise ValueError(f"{name} debe ser una lista de números enteros")
+    if data_format == 'binary' and not all(INT64_MIN <= x <= INT64_MAX for x in values):
+        raise ValueError(f"{name} solo puede contener enteros de 64 bits en formato binario")
+    return values
+
+def animation_data(arr, format='json'):
+    # Manejador para dispatcher.py: los datos ya decodificados (o en base64
+    # para el formato binario), listos para incluirlos en una respuesta JSON
+    arr = _int_list(arr, data_format=format)
+    data, cached = cached_animation_data(arr, format)
+    if format == 'binary':
+        import base64
+        return {'cached': cached, 'data_b64': base64.b64encode(data).decode('ascii')}
+    return {'cached': cached, 'data': json.loads(data)}
+
+# Sesiones (heapcore.HeapSession) de los ultimos arreglos pedidos por
+# ventanas de frames, por proceso
+MAX_SESSIONS = 16
+_sessions = OrderedDict()
 
-    return json.dumps(data_frames)
+def animation_session(arr):
+    key = cache_key('Heapsort2-session', arr)
+    session = _sessions.get(key)
+    if session is None:
+        session = heap_sort_session(list(arr), mark_extracted=False)
+        _sessions[key] = session
+        if len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+    else:
+        _sessions.move_to_end(key)
+    return session
+
+def frame_window(request_id, arr, start, stop):
+    # Respuesta a {"frames": [start, stop]}: solo esos frames (formato json),
+    # reproducidos desde el checkpoint mas cercano de la sesion del arreglo
+    session = animation_session(arr)
+    start, stop, _ = slice(start, stop).indices(len(session))
+    data = [frame_data(frame) for frame in session.frames(start, stop)]
+    return json.dumps({'id': request_id, 'total': len(session), 'start': start, 'data': data})
+
+def handle_request(line):
+    # Procesa una peticion NDJSON: {"id": ..., "arr": [...], "format": ...,
+    # "stats": true} o directamente [...]. Con "stats" la respuesta incluye
+    # las estadisticas del ordenamiento; con SORT_STATS=1 se escriben ademas
+    # en stderr, una linea por peticion. Con "frames": [inicio, fin] solo se
+    # devuelven esos frames (ver frame_window)
+    request_id = None
+    data_format = 'json'
+    want_stats = False
+    window = None
+    try:
+        request = json.loads(line)
+        if isinstance(request, dict):
+            request_id = request.get('id')
+            data_format = request.get('format', 'json')
+            want_stats = bool(request.get('stats'))
+            window = request.get('frames')
+            request = request.get('arr')
+        if data_format not in ('json', 'compact', 'binary'):
+            raise ValueError(f"formato desconocido {data_format!r}")
+        arr = _int_list(request, data_format=data_format)
+        if window is not None:
+            start, stop = _int_list(window, 'frames')
+    except (ValueError, TypeError) as e:
+        return json.dumps({'id': request_id, 'error': f"Petición inválida: {e}"})
+
+    try:
+        if window is not None:
+            return frame_window(request_id, arr, start, stop)
+        return animation_response(request_id, arr, data_format, want_stats)
+    except Exception as e:
+        # Las respuestas salen desordenadas: el error lleva el id de su peticion
+        return json.dumps({'id': request_id, 'error': f"Error interno: {type(e).__name__}: {e}"})
+
+def animation_response(request_id, arr, data_format='json', want_stats=False):
+    stats = SortStats('Heapsort2') if want_stats or stats_enabled() else None
+    output, cached = cached_animation_data(arr, data_format, stats)
+    extra = ''
+    if stats is not None:
+        stats.cache = get_cache().stats()
+        report = dict(stats.as_dict(), id=request_id, n=len(arr), cached=cached, format=data_format)
+        if stats_enabled():
+            print(json.dumps(report), file=sys.stderr, flush=True)
+        if want_stats:
+            extra = ', "stats": %s' % json.dumps(report)
+
+    if data_format == 'binary':
+        import base64
+        response = json.dumps({'id': request_id, 'cached': cached,
+                               'data_b64': base64.b64encode(output).decode('ascii')})
+        return response[:-1] + extra + '}'
+    # output ya es JSON; se inserta sin volver a parsearlo
+    return '{"id": %s, "cached": %s%s, "data": %s}' % (json.dumps(request_id), json.dumps(cached),
+                                                       extra, output)
+
+def serve_stream(infile, outfile, pool, max_pending):
+    # Lee peticiones linea a linea y escribe cada respuesta en cuanto termina
+    # (el orden de salida puede diferir del de entrada; usar "id" para casarlas)
+    lock = threading.Lock()
+    pending = threading.BoundedSemaphore(max_pending)
+
+    def write_result(future):
+        try:
+            response = future.result()
+        except Exception as e:
+            response = json.dumps({'id': None, 'error': f"Error interno: {e}"})
+        try:
+            with lock:
+                outfile.write(response + '\n')
+                outfile.flush()
+        except OSError:
+            pass  # Cliente desconectado (BrokenPipeError): la respuesta se descarta
+        finally:
+            # El hueco se devuelve siempre para que la espera final no se bloquee
+            pending.release()
+
+    for line in infile:
+        if not line.strip():
+            continue
+        pending.acquire()
+        pool.submit(handle_request, line).add_done_callback(write_result)
+    # Esperar a que todas las respuestas se hayan escrito
+    for _ in range(max_pending):
+        pending.acquire()
+
+def serve_socket(path, pool, max_pending):
+    import io
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            infile = io.TextIOWrapper(self.rfile, encoding='utf-8')
+            outfile = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+            serve_stream(infile, outfile, pool, max_pending)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        print(f"Worker escuchando en {path}", file=sys.stderr)
+        server.serve_forever()
+
+def run_worker(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Worker persistente de Heapsort2 (NDJSON)")
+    parser.add_argument('--worker', action='store_true')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Tamaño del pool de procesos")
+    parser.add_argument('--socket', help="Escuchar en un socket Unix en lugar de stdin")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Peticiones en vuelo por conexión (por defecto 2 * workers)")
+    args = parser.parse_args(argv)
+    max_pending = args.max_pending or 2 * args.workers
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        if args.socket:
+            serve_socket(args.socket, pool, max_pending)
+        else:
+            serve_stream(sys.stdin, sys.stdout, pool, max_pending)
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Uso: python script.py 10 5 8 3 6 ...")
-        sys.exit(1)
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        run_worker(sys.argv[1:])
+        sys.exit(0)
+
+    import argparse
 
+    parser = argparse.ArgumentParser(description="Datos de la animación de Heap Sort para un array dado")
+    parser.add_argument('arr', nargs='+', type=int, metavar='N', help="Valores enteros del array")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--stream', action='store_true',
+                      help="Escribir los frames (json) en stdout mientras se ordena")
+    mode.add_argument('--format', choices=('json', 'compact', 'binary'), default=None,
+                      help="Formato de los datos (por defecto json)")
+    args = parser.parse_intermixed_args()
+    arr, stream, data_format = args.arr, args.stream, args.format or 'json'
     try:
-        arr = [int(x) for x in sys.argv[1:]]
-    except ValueError:
-        print("Error: Todos los valores deben ser números enteros.")
-        sys.exit(1)
-
-    frames = heap_sort_with_animation(arr)
-    animation_data = generate_animation_data(frames)
-    
-    print(animation_data)  # Imprime los datos en formato JSON para que el servidor los capture
+        _int_list(arr, 'N', data_format)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if stream:
+        # Los frames se escriben en stdout mientras se ordena
+        write_animation_data(iter_heap_sort_frames(arr, mark_extracted=False), sys.stdout)
+        print()
+        sys.exit(0)
+
+    stats = SortStats('Heapsort2') if stats_enabled() else None
+    output, _ = cached_animation_data(arr, data_format, stats)
+    if stats is not None:
+        stats.cache = get_cache().stats()
+        stats.emit()
+
+    if data_format == 'binary':
+        sys.stdout.buffer.write(output)
+    else:
+        print(output)  # Imprime los datos en formato JSON para que el servidor los capture
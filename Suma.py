@@ -1,5 +1,12 @@
 import sys
 
+# Modo lote: python Suma.py --batch [archivo | -] [--block N]
+# Lee filas de operandos (CSV o NDJSON) y escribe un resultado por linea
+if len(sys.argv) > 1 and sys.argv[1] == '--batch':
+    from arithcore import run_batch
+    run_batch(sys.argv[2:], 'add', 2)
+    sys.exit(0)
+
 a = float(sys.argv[1])
 b = float(sys.argv[2])
 
@@ -0,0 +1,394 @@
+import sys
+import os
+import json
+import math
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from dispatcher import OperationStats
+from keyframes import DEFAULT_MAX_BYTES, DEFAULT_MAX_FRAMES
+
+# Servicio HTTP local (solo biblioteca estandar) para las animaciones:
+#   POST /heapsort    {"arr": [...], "format": "html"|"canvas"|"json"|"compact"|"binary",
+#                      "max_frames": N, "max_bytes": N}
+#   POST /bucketsort  {"arr": [...], "num_buckets": 5, "strategy": "uniform",
+#                      "max_frames": N, "max_bytes": N}
+#   GET  /health      estado y metricas (/metrics devuelve solo las metricas,
+#                     incluida la cache de render de los procesos del pool)
+#   GET  /assets/...  plotly.js compartido, si PLOTLY_ASSET_DIR esta definido
+#
+# El ordenamiento y el renderizado se hacen en un pool de procesos. Las
+# peticiones identicas que llegan mientras una ya se esta calculando se
+# unen a ese mismo calculo. Si hay demasiados calculos en vuelo se responde
+# 503 con Retry-After.
+#
+# Toda respuesta tiene un presupuesto de frames y de bytes (--max-frames,
+# --max-bytes): sin el, una traza completa crece con swaps * n y un solo
+# arreglo de unos miles de elementos ocupa cientos de MB. El cliente puede
+# pedir un presupuesto menor, nunca uno mayor. El reproductor de canvas no
+# lo necesita: su tamaño crece solo con el numero de swaps.
+#
+# Uso: python animserver.py [--host 127.0.0.1] [--port 8000] [--workers N]
+#          [--max-pending N] [--max-size N] [--max-frames N] [--max-bytes N]
+
+HEAP_FORMATS = ('html', 'canvas', 'json', 'compact', 'binary')
+MAX_BODY_BYTES = 1 * 2 ** 20
+READ_TIMEOUT = 10
+ASSET_ROUTE = '/assets/'
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               408: 'Request Timeout', 413: 'Payload Too Large', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+
+def render_heapsort(arr, format='html', max_frames=None, max_bytes=None):
+    # Se ejecuta en un proceso del pool; los modulos se importan una vez por proceso
+    if format == 'canvas':
+        # Reproductor de canvas: siempre la traza completa, sin presupuesto
+        from canvasplayer import player_html
+        from heapplot import COLOR_MAP, heap_sort_with_animation
+
+        html = player_html(heap_sort_with_animation(list(arr)), COLOR_MAP)
+        return html.encode('utf-8'), 'text/html; charset=utf-8'
+    if format != 'html':
+        from Heapsort2 import cached_animation_data
+
+        data, _ = cached_animation_data(arr, format, max_frames=max_frames, max_bytes=max_bytes)
+        if format == 'binary':
+            return data, 'application/octet-stream'
+        return data.encode('utf-8'), 'application/json'
+
+    import heapplot
+    from fastfig import to_html
+    from plotlyasset import plotlyjs_include
+    from rendercache import cache_key, get_cache
+
+    cache = get_cache()
+    key = cache_key('animserver-heapsort', arr, {'max_frames': max_frames, 'max_bytes': max_bytes,
+                                                 'plotlyjs': plotlyjs_include()})
+
+    def build():
+        # max_bytes es el tamaño de toda la pagina, plotly.js incluido
+        frames = list(heapplot.heap_sort_with_animation(
+            list(arr), max_frames=max_frames, max_bytes=max_bytes,
+            overhead=heapplot.page_overhead(arr, plotlyjs_include())))
+        return to_html(heapplot.animation_figure_dict(frames),
+                       include_plotlyjs=plotlyjs_include()).encode('utf-8')
+
+    return cache.get_or_create(key, build), 'text/html; charset=utf-8'
+
+
+def render_bucketsort(arr, num_buckets=5, strategy='uniform', max_frames=None, max_bytes=None):
+    import bucketsort
+
+    html = bucketsort.animation_fragment(arr, num_buckets, strategy, max_frames, max_bytes)
+    return html.encode('utf-8'), 'text/html; charset=utf-8'
+
+
+def run_in_worker(fn, *args):
+    # Resultado de fn junto con las estadisticas de la cache de render de
+    # este proceso del pool (cada proceso tiene su propia get_cache())
+    from rendercache import get_cache
+
+    return fn(*args), os.getpid(), get_cache().stats()
+
+
+def merge_cache_stats(per_worker):
+    # Suma los contadores de cada proceso y recalcula la tasa de aciertos
+    total = {}
+    for stats in per_worker.values():
+        for name, value in stats.items():
+            if name != 'hit_rate':
+                total[name] = total.get(name, 0) + value
+    hits = total.get('memory_hits', 0) + total.get('disk_hits', 0)
+    lookups = hits + total.get('misses', 0)
+    total['hit_rate'] = hits / lookups if lookups else 0.0
+    total['workers'] = len(per_worker)
+    return total
+
+
+class BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_heapsort(body, limits):
+    arr = _parse_arr(body, limits['max_size'], int)
+    data_format = body.get('format', 'html')
+    if data_format not in HEAP_FORMATS:
+        raise BadRequest(400, f"format debe ser uno de {', '.join(HEAP_FORMATS)}")
+    if data_format == 'canvas':
+        return render_heapsort, (arr, data_format, None, None)
+    return render_heapsort, (arr, data_format, *_parse_budget(body, limits))
+
+
+def parse_bucketsort(body, limits):
+    from bucketcore import STRATEGIES
+
+    arr = _parse_arr(body, limits['max_size'], float)
+    num_buckets = body.get('num_buckets', 5)
+    if not _is_int(num_buckets) or not 1 <= num_buckets <= 100:
+        raise BadRequest(400, "num_buckets debe ser un entero entre 1 y 100")
+    strategy = body.get('strategy', 'uniform')
+    if strategy not in STRATEGIES:
+        raise BadRequest(400, f"strategy debe ser uno de {', '.join(STRATEGIES)}")
+    return render_bucketsort, (arr, num_buckets, strategy, *_parse_budget(body, limits))
+
+
+def _parse_budget(body, limits):
+    # Presupuesto pedido por el cliente, acotado por el del servidor
+    budget = []
+    for name in ('max_frames', 'max_bytes'):
+        value = body.get(name)
+        if value is not None and (not _is_int(value) or value < 1):
+            raise BadRequest(400, f"{name} debe ser un entero positivo")
+        budget.append(limits[name] if value is None else min(value, limits[name]))
+    return budget
+
+
+def _is_int(value):
+    # En Python bool es subclase de int: true no es un presupuesto valido
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def _parse_arr(body, max_size, cast):
+    arr = body.get('arr')
+    if not isinstance(arr, list) or not arr:
+        raise BadRequest(400, "arr debe ser una lista no vacia")
+    if len(arr) > max_size:
+        raise BadRequest(413, f"arr admite como maximo {max_size} elementos")
+    # Solo numeros JSON: int(x)/float(x) aceptarian true, "12" o truncarian 1.7.
+    # json.loads acepta ademas NaN, Infinity y 1e400 (inf)
+    if not all(isinstance(x, (int, float)) and not isinstance(x, bool)
+               and (isinstance(x, int) or math.isfinite(x)) for x in arr):
+        raise BadRequest(400, "arr solo puede contener numeros finitos")
+    if cast is int:
+        # Enteros (o floats sin parte decimal) dentro del rango de int64,
+        # el que admiten los formatos binarios
+        if not all(isinstance(x, int) or x.is_integer() for x in arr):
+            raise BadRequest(400, "arr solo puede contener numeros enteros")
+        values = [int(x) for x in arr]
+        if not all(INT64_MIN <= x <= INT64_MAX for x in values):
+            raise BadRequest(400, "arr solo puede contener enteros de 64 bits")
+        return values
+    try:
+        floats = [float(x) for x in arr]
+    except OverflowError:
+        raise BadRequest(400, "arr solo puede contener numeros finitos")
+    # Para bucketsort se conservan los enteros tal cual (misma clave de cache)
+    return [int(x) if f.is_integer() else x for x, f in zip(arr, floats)]
+
+
+ENDPOINTS = {'/heapsort': parse_heapsort, '/bucketsort': parse_bucketsort}
+
+
+class AnimationServer:
+    def __init__(self, executor, max_pending=32, max_size=5000, max_frames=DEFAULT_MAX_FRAMES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.executor = executor
+        self.max_pending = max_pending
+        self.limits = {'max_size': max_size, 'max_frames': max_frames, 'max_bytes': max_bytes}
+        self.inflight = {}
+        self.started = time.time()
+        self.stats = {path: OperationStats() for path in ENDPOINTS}
+        self.cache_stats = {}
+        self.counters = {'requests': 0, 'computations': 0, 'coalesced': 0, 'rejected': 0,
+                         'errors': 0}
+
+    def metrics(self):
+        return {
+            'uptime_s': time.time() - self.started,
+            'inflight': len(self.inflight),
+            'max_pending': self.max_pending,
+            'limits': self.limits,
+            **self.counters,
+            'endpoints': {path: stats.as_dict() for path, stats in self.stats.items()},
+            'cache': merge_cache_stats(self.cache_stats),
+        }
+
+    async def compute(self, path, fn, args):
+        # Las peticiones identicas en vuelo comparten el mismo futuro
+        key = (path, json.dumps(args))
+        future = self.inflight.get(key)
+        if future is None:
+            if len(self.inflight) >= self.max_pending:
+                self.counters['rejected'] += 1
+                raise BadRequest(503, "servidor ocupado, reintentar mas tarde")
+
+            loop = asyncio.get_running_loop()
+            future = asyncio.ensure_future(loop.run_in_executor(self.executor, run_in_worker,
+                                                                fn, *args))
+            self.inflight[key] = future
+            self.counters['computations'] += 1
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        else:
+            self.counters['coalesced'] += 1
+        result, pid, cache_stats = await asyncio.shield(future)
+        self.cache_stats[pid] = cache_stats
+        return result
+
+    async def handle_request(self, method, path, body):
+        path = path.split('?', 1)[0]
+        if path in ('/health', '/metrics'):
+            metrics = self.metrics()
+            payload = {'status': 'ok', **metrics} if path == '/health' else metrics
+            return 200, json.dumps(payload).encode('utf-8'), 'application/json'
+        if path.startswith(ASSET_ROUTE) and method == 'GET':
+            return read_asset(path[len(ASSET_ROUTE):])
+
+        parse = ENDPOINTS.get(path)
+        if parse is None:
+            raise BadRequest(404, f"ruta desconocida: {path}")
+        if method != 'POST':
+            raise BadRequest(405, "usar POST con un cuerpo JSON")
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError as e:
+            raise BadRequest(400, f"JSON invalido: {e}")
+        if not isinstance(request, dict):
+            raise BadRequest(400, "se esperaba un objeto JSON")
+        fn, args = parse(request, self.limits)
+
+        start = time.perf_counter()
+        error = False
+        try:
+            content, content_type = await self.compute(path, fn, args)
+        except BadRequest:
+            raise
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.stats[path].add((time.perf_counter() - start) * 1000, error)
+        return 200, content, content_type
+
+    async def handle_connection(self, reader, writer):
+        try:
+            try:
+                method, path, body = await asyncio.wait_for(read_request(reader), READ_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise BadRequest(408, "tiempo de espera agotado")
+            self.counters['requests'] += 1
+            status, content, content_type = await self.handle_request(method, path, body)
+            headers = {}
+        except BadRequest as e:
+            status, content, content_type = error_response(e.status, str(e))
+            headers = {'Retry-After': '1'} if e.status == 503 else {}
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+        except Exception as e:
+            self.counters['errors'] += 1
+            status, content, content_type = error_response(500, f"{type(e).__name__}: {e}")
+            headers = {}
+
+        try:
+            writer.write(response_head(status, content_type, len(content), headers) + content)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def read_request(reader):
+    # HTTP/1.1 minimo: linea de peticion, cabeceras y cuerpo con Content-Length
+    request_line = (await reader.readline()).decode('latin-1').split()
+    if len(request_line) != 3:
+        raise BadRequest(400, "linea de peticion invalida")
+    method, path, _ = request_line
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise BadRequest(400, "Content-Length invalido")
+    if length > MAX_BODY_BYTES:
+        raise BadRequest(413, f"el cuerpo admite como maximo {MAX_BODY_BYTES} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path, body
+
+
+def read_asset(name):
+    # Solo archivos del directorio de assets (plotlyasset), sin subdirectorios
+    from plotlyasset import ASSET_DIR_ENV
+
+    asset_dir = os.environ.get(ASSET_DIR_ENV)
+    path = os.path.join(asset_dir or '', name)
+    if not asset_dir or not name or os.path.basename(name) != name or not os.path.isfile(path):
+        raise BadRequest(404, f"asset desconocido: {name}")
+    with open(path, 'rb') as fp:
+        content = fp.read()
+    content_type = 'text/javascript' if name.endswith('.js') else 'application/octet-stream'
+    return 200, content, content_type
+
+
+def error_response(status, message):
+    return status, json.dumps({'error': message}).encode('utf-8'), 'application/json'
+
+
+def response_head(status, content_type, length, headers=None):
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+             f"Content-Type: {content_type}",
+             f"Content-Length: {length}",
+             "Connection: close"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def serve(host, port, workers, max_pending, max_size, max_frames=DEFAULT_MAX_FRAMES,
+                max_bytes=DEFAULT_MAX_BYTES):
+    from plotlyasset import ASSET_DIR_ENV, ASSET_URL_ENV
+
+    # Con un directorio de assets y sin URL propia, el HTML apunta a
+    # /assets/ de este servidor en lugar de a una ruta del disco (el entorno
+    # se fija antes de crear el pool para que los procesos lo hereden)
+    if os.environ.get(ASSET_DIR_ENV) and not os.environ.get(ASSET_URL_ENV):
+        os.environ[ASSET_URL_ENV] = ASSET_ROUTE.rstrip('/')
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        app = AnimationServer(executor, max_pending, max_size, max_frames, max_bytes)
+        server = await asyncio.start_server(app.handle_connection, host, port,
+                                            backlog=max(128, 4 * max_pending))
+        address = server.sockets[0].getsockname()
+        print(f"Sirviendo animaciones en http://{address[0]}:{address[1]}", file=sys.stderr,
+              flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de animaciones")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help="0 elige un puerto libre")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Tamaño del pool de procesos")
+    parser.add_argument('--max-pending', type=int, default=32,
+                        help="Calculos distintos en vuelo antes de responder 503")
+    parser.add_argument('--max-size', type=int, default=5000,
+                        help="Elementos maximos por arreglo")
+    parser.add_argument('--max-frames', type=int, default=DEFAULT_MAX_FRAMES,
+                        help="Frames maximos por animacion")
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help="Bytes maximos por respuesta (plotly.js incluido)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_pending, args.max_size,
+                          args.max_frames, args.max_bytes))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+import json
+import uuid
+
+
+def write_json_array(items, fp, dumps=json.dumps):
+    """Escribe items como un array JSON, un elemento a la vez.
+
+    La salida es identica a fp.write(dumps(list(items))) pero nunca se
+    tiene la lista completa en memoria, y cada elemento llega al consumidor
+    en cuanto se produce.
+    """
+    fp.write('[')
+    for k, item in enumerate(items):
+        if k:
+            fp.write(', ')
+        fp.write(dumps(item))
+        fp.flush()
+    fp.write(']')
+    fp.flush()
+
+
+def write_html_stream(fp, frames, trace_fn, layout_fn, frame_layout_fn=None,
+                      config=None, include_plotlyjs=True, full_html=True):
+    """Escribe una animacion de plotly en HTML a medida que llegan los frames.
+
+    trace_fn(frame) devuelve la traza de cada frame, frame_layout_fn(frame)
+    (opcional) el layout propio del frame, y
+    layout_fn(first_frame, last_frame, max_val) el layout de la figura, que
+    se escribe al final, cuando ya se conocen el ultimo frame y el maximo.
+    Cada frame se serializa y se descarta, asi que la memoria no crece con
+    el numero de frames.
+    """
+    from plotly.io.json import to_json_plotly
+
+    div_id = str(uuid.uuid4())
+    if full_html:
+        fp.write('<html>\n<head><meta charset="utf-8" /></head>\n<body>\n')
+    if include_plotlyjs is True:
+        from plotly.offline import get_plotlyjs
+        fp.write(f'<script type="text/javascript">{get_plotlyjs()}</script>\n')
+    elif isinstance(include_plotlyjs, str):
+        fp.write(f'<script src="{include_plotlyjs}"></script>\n')
+    fp.write(f'<div id="{div_id}" class="plotly-graph-div"></div>\n')
+    fp.write('<script>var animationFrames = [];</script>\n')
+    fp.flush()
+
+    first_frame = frame = None
+    max_val = None
+    for i, frame in enumerate(frames):
+        if first_frame is None:
+            first_frame = frame
+        frame_max = max(frame['arr'], default=None)
+        if frame_max is not None and (max_val is None or frame_max > max_val):
+            max_val = frame_max
+
+        fig_frame = {'data': [trace_fn(frame)], 'name': str(i)}
+        if frame_layout_fn is not None:
+            fig_frame['layout'] = frame_layout_fn(frame)
+        fp.write(f'<script>animationFrames.push({to_json_plotly(fig_frame)});</script>\n')
+        fp.flush()
+
+    layout = to_json_plotly(layout_fn(first_frame, frame, max_val or 0))
+    config = to_json_plotly(config if config is not None else {'responsive': True})
+    fp.write(
+        '<script>\n'
+        f'    Plotly.newPlot("{div_id}", animationFrames[0].data, {layout}, {config})'
+        f'.then(function () {{ return Plotly.addFrames("{div_id}", animationFrames); }});\n'
+        '</script>\n'
+    )
+    if full_html:
+        fp.write('</body>\n</html>\n')
+    fp.flush()
@@ -0,0 +1,243 @@
+import sys
+import os
+import json
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from keyframes import DEFAULT_MAX_BYTES, DEFAULT_MAX_FRAMES
+
+# Render por lotes: genera muchas animaciones repartiendo los trabajos de un
+# manifiesto entre un pool de procesos. Cada proceso importa plotly y los
+# modulos de los scripts una sola vez (initializer) y reutiliza el template
+# de la figura, asi que un trabajo solo paga ordenar y serializar.
+#
+# El manifiesto es un array JSON o NDJSON (un trabajo por linea):
+#   {"algorithm": "heapsort", "arr": [5, 3, 8], "output": "out/a.html"}
+#   {"algorithm": "bucketsort", "seed": 7, "size": 50, "output": "out/b.html",
+#    "num_buckets": 5, "strategy": "quantile"}
+#   {"algorithm": "heapsort-canvas", "seed": 1, "size": 2000, "output": "out/c.html"}
+# Con seed/size el arreglo es default_rng(seed).integers(low, high, size),
+# con low=1 y high=100 por defecto.
+#
+# Uso: python batchrender.py manifiesto.json [resumen.json] [--workers N]
+#          [--max-frames N] [--max-bytes N] [--asset-dir DIR]
+#
+# Las animaciones heapsort y bucketsort se muestrean para no pasar de
+# --max-frames frames ni de --max-bytes bytes por pagina (por defecto
+# keyframes.DEFAULT_MAX_FRAMES y DEFAULT_MAX_BYTES, 300 y 8 MB); un trabajo
+# puede pedir limites menores con sus propios "max_frames" / "max_bytes".
+#
+# El resumen se reescribe a medida que avanzan los trabajos (progreso,
+# fallos y tiempo de cada trabajo) y queda completo al terminar.
+
+ALGORITHMS = ('heapsort', 'heapsort-canvas', 'bucketsort')
+SUMMARY_INTERVAL = 1.0
+
+
+def _init_worker():
+    # Importaciones y template comunes, una vez por proceso
+    import importlib
+    from fastfig import default_template
+
+    for module in ('heapplot', 'bucketsort'):
+        importlib.import_module(module)
+
+    default_template()
+
+
+def load_manifest(path):
+    """Lista de trabajos de un manifiesto (array JSON o NDJSON)."""
+    with open(path, encoding='utf-8') as fp:
+        text = fp.read()
+    if text.lstrip()[:1] == '[':
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def job_array(job):
+    if 'arr' in job:
+        return list(job['arr'])
+    import numpy as np
+
+    rng = np.random.default_rng(job['seed'])
+    return rng.integers(job.get('low', 1), job.get('high', 100), job['size']).tolist()
+
+
+def job_budget(job, max_frames=DEFAULT_MAX_FRAMES, max_bytes=DEFAULT_MAX_BYTES):
+    # (max_frames, max_bytes) del trabajo: los suyos, acotados por los del lote
+    budget = []
+    for name, limit in (('max_frames', max_frames), ('max_bytes', max_bytes)):
+        value = job.get(name)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise ValueError(f"{name} debe ser un entero positivo, no {value!r}")
+        budget.append(limit if value is None else min(value, limit))
+    return budget
+
+
+def render_job(job, max_frames=DEFAULT_MAX_FRAMES, max_bytes=DEFAULT_MAX_BYTES):
+    # Devuelve (html, numero de frames); se ejecuta en un proceso del pool.
+    # max_frames / max_bytes son los limites del lote (ver job_budget)
+    from fastfig import to_html
+    from plotlyasset import plotlyjs_include
+
+    algorithm = job.get('algorithm')
+    arr = job_array(job)
+    output = job['output']
+    max_frames, max_bytes = job_budget(job, max_frames, max_bytes)
+    if algorithm == 'heapsort':
+        import heapplot
+
+        # max_bytes es el tamaño de toda la pagina, plotly.js incluido
+        frames = heapplot.heap_sort_with_animation(
+            arr, max_frames=max_frames, max_bytes=max_bytes,
+            overhead=heapplot.page_overhead(arr, plotlyjs_include(output)))
+        frames = list(frames)
+        html = to_html(heapplot.animation_figure_dict(frames),
+                       include_plotlyjs=plotlyjs_include(output))
+    elif algorithm == 'heapsort-canvas':
+        import heapplot
+        from canvasplayer import player_html
+
+        frames = heapplot.heap_sort_with_animation(arr)
+        html = player_html(frames, heapplot.COLOR_MAP)
+    elif algorithm == 'bucketsort':
+        import bucketsort
+
+        num_buckets = job.get('num_buckets', 5)
+        frames = bucketsort.bucket_sort_with_animation(
+            arr, num_buckets, job.get('strategy', 'uniform'), max_frames=max_frames,
+            max_bytes=max_bytes,
+            overhead=bucketsort.page_overhead(arr, num_buckets, plotlyjs_include(output)))
+        frames = list(frames)
+        html = to_html(bucketsort.animation_figure_dict(frames),
+                       include_plotlyjs=plotlyjs_include(output), config=bucketsort.HTML_CONFIG)
+    else:
+        raise ValueError(f"algoritmo desconocido: {algorithm!r} (opciones: {', '.join(ALGORITHMS)})")
+    return html, len(frames)
+
+
+def job_result(index, job):
+    # Entrada inicial del resumen; un trabajo que no es un objeto no tiene campos
+    if not isinstance(job, dict):
+        return {'index': index, 'algorithm': None, 'output': None}
+    return {'index': index, 'algorithm': job.get('algorithm'), 'output': job.get('output')}
+
+
+def run_job(index, job, max_frames=DEFAULT_MAX_FRAMES, max_bytes=DEFAULT_MAX_BYTES):
+    """Renderiza un trabajo y devuelve su entrada del resumen (nunca lanza)."""
+    start = time.perf_counter()
+    result = job_result(index, job)
+    try:
+        if not isinstance(job, dict):
+            raise ValueError(f"el trabajo debe ser un objeto JSON, no {job!r}")
+        html, frames = render_job(job, max_frames, max_bytes)
+        output = job['output']
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        data = html.encode('utf-8')
+        with open(output, 'wb') as fp:
+            fp.write(data)
+        result.update(status='ok', frames=frames, bytes=len(data))
+    except Exception as e:
+        result.update(status='error', error=f"{type(e).__name__}: {e}")
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def write_summary(path, summary):
+    # Escritura atomica: quien lea el resumen nunca ve un JSON a medias
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+            json.dump(summary, fp, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def run_batch(jobs, summary_path=None, workers=None, max_frames=DEFAULT_MAX_FRAMES,
+              max_bytes=DEFAULT_MAX_BYTES, progress=sys.stderr):
+    """Renderiza los trabajos en un pool de procesos y devuelve el resumen.
+
+    max_frames / max_bytes limitan cada animacion heapsort y bucketsort; los
+    trabajos solo pueden pedir limites menores.
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = {'total': len(jobs), 'done': 0, 'ok': 0, 'failed': 0, 'workers': workers,
+               'seconds': 0.0, 'jobs_per_second': 0.0, 'finished': False, 'results': []}
+    start = time.perf_counter()
+    last_write = 0.0
+
+    def update():
+        summary['seconds'] = time.perf_counter() - start
+        summary['jobs_per_second'] = summary['done'] / summary['seconds'] if summary['seconds'] else 0.0
+        if summary_path:
+            write_summary(summary_path, summary)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        # Los limites se aplican en cada trabajo: uno mal formado solo falla el suyo
+        futures = {executor.submit(run_job, index, job, max_frames, max_bytes): index
+                   for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # Un proceso murio (o fallo el initializer): run_job no llego a
+                # devolver su resultado, el trabajo cuenta como fallido
+                index = futures[future]
+                result = dict(job_result(index, jobs[index]), status='error',
+                              error=f"{type(e).__name__}: {e}", seconds=0.0)
+            summary['results'].append(result)
+            summary['done'] += 1
+            summary['ok' if result['status'] == 'ok' else 'failed'] += 1
+            if progress is not None:
+                detail = (f"{result['seconds']:.2f}s" if result['status'] == 'ok'
+                          else result['error'])
+                print(f"[{summary['done']}/{len(jobs)}] {result['status']} {result['output']} {detail}",
+                      file=progress, flush=True)
+            if time.perf_counter() - last_write >= SUMMARY_INTERVAL:
+                update()
+                last_write = time.perf_counter()
+
+    summary['results'].sort(key=lambda result: result['index'])
+    summary['finished'] = True
+    update()
+    return summary
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render por lotes de animaciones")
+    parser.add_argument('manifest', help="Manifiesto de trabajos (array JSON o NDJSON)")
+    parser.add_argument('summary', nargs='?', default='batch_summary.json',
+                        help="Archivo JSON del resumen")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Tamaño del pool de procesos (por defecto, uno por CPU)")
+    parser.add_argument('--max-frames', type=int, default=DEFAULT_MAX_FRAMES,
+                        help="Frames maximos por animacion (los trabajos pueden pedir menos)")
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help="Bytes maximos por pagina HTML (los trabajos pueden pedir menos)")
+    parser.add_argument('--asset-dir', help="Directorio donde escribir plotly.js una sola vez")
+    args = parser.parse_args(argv)
+
+    if args.asset_dir:
+        # plotly.js se escribe una vez y todos los HTML lo referencian
+        from plotlyasset import ASSET_DIR_ENV
+        os.environ[ASSET_DIR_ENV] = args.asset_dir
+
+    jobs = load_manifest(args.manifest)
+    summary_path = args.summary
+    summary = run_batch(jobs, summary_path, args.workers, args.max_frames, args.max_bytes)
+    print(f"{summary['ok']}/{summary['total']} animaciones en {summary['seconds']:.1f}s "
+          f"({summary['jobs_per_second']:.1f}/s, {summary['failed']} fallidas); "
+          f"resumen en {summary_path}")
+    if summary['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+import sys
+import json
+import math
+import time
+import platform
+from array import array
+
+import numpy as np
+
+from bench_sorts import DISTRIBUTIONS, git_commit, make_array, parse_sizes
+from heapcore import heap_sort
+from heapengine import VARIANTS, heap_sort_buffer
+from sortstats import SortStats
+
+# Compara las variantes de heapengine.heap_sort_buffer (y heapcore.heap_sort
+# como referencia) por contenedor: lista, array.array y ndarray, todos
+# ordenados en su lugar. Para cada caso guarda el mejor tiempo de pared y las
+# comparaciones (en una ejecucion aparte con SortStats), tambien normalizadas
+# por n log2 n, e indica el motor mas rapido por tamaño y contenedor.
+#
+# Uso: python bench_heaps.py [salida.json] [--sizes 1000,10000,100000]
+#          [--distributions uniform,duplicates] [--repeat 3]
+
+CONTAINERS = {
+    'list': lambda arr: arr.tolist(),
+    'array': lambda arr: array('q', arr.tolist()),
+    'ndarray': lambda arr: arr.copy(),
+}
+
+ENGINES = {'heapcore': lambda data, stats=None: heap_sort(data, stats=stats)}
+ENGINES.update({variant: (lambda data, stats=None, variant=variant:
+                          heap_sort_buffer(data, variant, stats))
+                for variant in VARIANTS})
+
+
+def measure(engine, make, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        data = make()
+        start = time.perf_counter()
+        engine(data)
+        best = min(best, time.perf_counter() - start)
+    stats = SortStats()
+    data = make()
+    engine(data, stats=stats)
+    return best, stats.comparisons, data
+
+
+def run(sizes, distributions, repeat):
+    results = []
+    for distribution in distributions:
+        for n in sizes:
+            base = np.asarray(make_array(distribution, n), dtype=np.int64)
+            expected = np.sort(base).tolist()
+            nlogn = n * math.log2(n) if n > 1 else 1
+            for container, convert in CONTAINERS.items():
+                rows = []
+                for engine_name, engine in ENGINES.items():
+                    seconds, comparisons, data = measure(engine, lambda: convert(base), repeat)
+                    if list(data) != expected:
+                        raise AssertionError(f"{engine_name} no ordena {container} n={n}")
+                    rows.append({'distribution': distribution, 'n': n, 'container': container,
+                                 'engine': engine_name, 'seconds': seconds,
+                                 'comparisons': comparisons,
+                                 'comparisons_per_nlogn': comparisons / nlogn})
+                fastest = min(rows, key=lambda row: row['seconds'])
+                for row in rows:
+                    row['fastest'] = row is fastest
+                    print(f"{distribution:>10} n={n:<8} {container:>7} {row['engine']:>10}: "
+                          f"{row['seconds']:.4f}s  {row['comparisons']:>10} comp "
+                          f"({row['comparisons_per_nlogn']:.2f} n log2 n)"
+                          f"{'  <- mas rapido' if row['fastest'] else ''}")
+                results.extend(rows)
+    return results
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de las variantes de heap sort")
+    parser.add_argument('output', nargs='?', help="Archivo JSON de resultados (opcional)")
+    parser.add_argument('--sizes', type=parse_sizes, default='1000,10000,100000',
+                        help="Tamaños separados por comas")
+    parser.add_argument('--distributions', default='uniform,duplicates',
+                        help=f"Distribuciones separadas por comas ({', '.join(DISTRIBUTIONS)})")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repeticiones por caso (se guarda la mejor)")
+    args = parser.parse_args(argv)
+
+    distributions = args.distributions.split(',')
+    unknown = set(distributions) - set(DISTRIBUTIONS)
+    if unknown:
+        parser.error(f"distribuciones desconocidas: {', '.join(sorted(unknown))}")
+
+    results = run(args.sizes, distributions, args.repeat)
+    if args.output:
+        report = {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'repeat': args.repeat,
+            'results': results,
+        }
+        with open(args.output, 'w') as fp:
+            json.dump(report, fp, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
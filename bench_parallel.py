@@ -0,0 +1,52 @@
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bucketcore import bucket_sort, bucket_sort_parallel
+
+# Curva de escalado de bucket_sort_parallel con el numero de procesos.
+# Uso: python bench_parallel.py [n] [salida.json]
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    output = sys.argv[2] if len(sys.argv) > 2 else None
+    cpus = os.cpu_count() or 1
+    arr = np.random.rand(n)
+
+    base = timed(lambda: bucket_sort(arr))
+    results = [{'workers': 0, 'engine': 'bucket_sort', 'seconds': base, 'speedup': 1.0}]
+    print(f"n={n} cpus={cpus}")
+    print(f"bucket_sort (1 proceso): {base:.3f}s")
+    print(f"np.sort: {timed(lambda: np.sort(arr)):.3f}s")
+
+    counts = sorted({2 ** k for k in range(cpus.bit_length()) if 2 ** k <= cpus} | {cpus})
+    for workers in counts:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Arrancar los procesos antes de medir
+            list(executor.map(abs, range(workers)))
+            seconds = timed(lambda: bucket_sort_parallel(arr, workers, executor=executor))
+        results.append({'workers': workers, 'engine': 'bucket_sort_parallel',
+                        'seconds': seconds, 'speedup': base / seconds})
+        print(f"bucket_sort_parallel workers={workers}: {seconds:.3f}s  x{base / seconds:.2f}")
+
+    if output:
+        with open(output, 'w') as fp:
+            json.dump({'n': n, 'cpus': cpus, 'results': results}, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
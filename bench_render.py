@@ -0,0 +1,111 @@
+import sys
+import io
+import json
+import time
+import base64
+import random
+import contextlib
+
+import numpy as np
+import plotly.io as pio
+
+from bucketcore import iter_bucket_sort_frames
+from heapcore import heap_sort
+
+# Compara el renderizado con graph_objects (create_animation) contra la
+# figura construida con dicts planos (animation_figure_dict), comprobando
+# que ambas producen el mismo JSON.
+# Uso: python bench_render.py [tamaño_heap] [tamaño_bucket]
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def decode_typed_arrays(obj):
+    # graph_objects codifica los arrays de NumPy como {'dtype', 'bdata'}
+    # (base64); plotly.js los decodifica igual que una lista
+    if isinstance(obj, dict):
+        if set(obj) == {'dtype', 'bdata'}:
+            return np.frombuffer(base64.b64decode(obj['bdata']), dtype=obj['dtype']).tolist()
+        return {k: decode_typed_arrays(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [decode_typed_arrays(v) for v in obj]
+    return obj
+
+
+def canonical(fig_json):
+    # Mismo JSON salvo el orden de las claves y la codificacion de los arrays
+    return json.dumps(decode_typed_arrays(json.loads(fig_json)), sort_keys=True)
+
+
+def go_figure_json(build):
+    # create_animation escribe/imprime el HTML; aqui solo interesa la figura
+    captured = {}
+    original_write, original_to_html = pio.write_html, pio.to_html
+
+    def capture(fig, *args, **kwargs):
+        captured['json'] = pio.to_json(fig)
+        return ''
+
+    pio.write_html = pio.to_html = capture
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fig = build()
+    finally:
+        pio.write_html, pio.to_html = original_write, original_to_html
+    return captured.get('json') or pio.to_json(fig)
+
+
+def bench(name, frames, go_build, fast_build):
+    go_time, go_json = timed(lambda: go_figure_json(go_build))
+    fast_time, fast_json = timed(lambda: pio.to_json(fast_build(), validate=False))
+    equal = canonical(go_json) == canonical(fast_json)
+    print(f"{name}: {len(frames)} frames | graph_objects {go_time:.3f}s | "
+          f"dicts {fast_time:.3f}s | x{go_time / fast_time:.1f} | mismo JSON: {equal}")
+    return equal
+
+
+def main():
+    heap_size = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    bucket_size = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    ok = True
+
+    import HeapSortSYS
+    arr = [random.randint(1, 100) for _ in range(heap_size)]
+    frames = list(heap_sort(arr[:], trace=True))
+    ok &= bench('HeapSortSYS', frames,
+                lambda: HeapSortSYS.create_animation(frames, '/dev/null'),
+                lambda: HeapSortSYS.animation_figure_dict(frames))
+
+    import heapsort
+    arr = np.random.randint(1, 100, heap_size)
+    frames = list(heap_sort(arr, trace=True))
+    ok &= bench('heapsort', frames,
+                lambda: heapsort.create_animation(frames, '/dev/null'),
+                lambda: heapsort.animation_figure_dict(frames))
+
+    import bucketsort
+    import bucketsort2
+
+    arr = np.random.permutation(10 * bucket_size)[:bucket_size]
+    frames = list(iter_bucket_sort_frames(arr))
+    ok &= bench('bucketsort', frames,
+                lambda: bucketsort.create_animation(frames),
+                lambda: bucketsort.animation_figure_dict(frames))
+
+    frames = list(iter_bucket_sort_frames(arr, include_initial=False))
+    ok &= bench('bucketsort2', frames,
+                lambda: bucketsort2.create_animation(frames),
+                lambda: bucketsort2.animation_figure_dict(frames))
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import os
+import io
+import sys
+import json
+import time
+import platform
+import tempfile
+import contextlib
+import subprocess
+import tracemalloc
+import webbrowser
+
+import numpy as np
+
+from bucketcore import bucket_sort, bucket_sort_trace
+from heapcore import heap_sort
+
+# Benchmark de los motores de ordenamiento, la generacion de frames, la
+# serializacion (generate_animation_data) y el renderizado (create_animation).
+# Para cada etapa guarda el mejor tiempo de pared, el pico de memoria medido
+# con tracemalloc (en una ejecucion aparte, porque tracemalloc ralentiza) y
+# los bytes de salida. Los resultados se escriben en JSON; con --compare se
+# comparan con los de otra ejecucion (por ejemplo, de otro commit).
+#
+# Uso: python bench_sorts.py [salida.json] [--sizes 1000,10000,100000]
+#          [--trace-sizes 30,100] [--repeat 3] [--go] [--compare anterior.json]
+#
+# --go incluye tambien el renderizado con graph_objects (create_animation
+# sin fast), que es mucho mas lento.
+
+DISTRIBUTIONS = ('uniform', 'sorted', 'reversed', 'duplicates', 'skewed')
+
+# Umbral a partir del cual --compare marca una etapa como regresion; las
+# etapas de menos de MIN_SECONDS se ignoran porque su tiempo es sobre todo ruido
+REGRESSION_RATIO = 1.25
+MIN_SECONDS = 1e-3
+
+
+def make_array(distribution, n, seed=0):
+    rng = np.random.default_rng(seed)
+    if distribution == 'duplicates':
+        return rng.integers(1, 10, n)
+    if distribution == 'skewed':
+        return (rng.lognormal(0, 2, n) * 10).astype(np.int64) + 1
+    arr = rng.integers(1, 10 * n, n)
+    if distribution == 'sorted':
+        return np.sort(arr)
+    if distribution == 'reversed':
+        return np.sort(arr)[::-1].copy()
+    return arr
+
+
+def output_bytes(result):
+    if isinstance(result, (bytes, str)):
+        return len(result)
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    return None
+
+
+def measure(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak, 'output_bytes': output_bytes(result)}
+
+
+def file_output(fn, path):
+    # Para las funciones que escriben un archivo: la salida es su contenido
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        with open(path, 'rb') as fp:
+            return fp.read()
+    return run
+
+
+def sort_cases(arr):
+    values = arr.tolist()
+    return {
+        'sorted': lambda: sorted(values),
+        'np.sort': lambda: np.sort(arr),
+        'heap_sort': lambda: heap_sort(values[:]),
+        'bucket_sort': lambda: bucket_sort(arr),
+        'bucket_sort_quantile': lambda: bucket_sort(arr, strategy='quantile'),
+    }
+
+
+def trace_cases(arr, workdir, go_render):
+    import fastfig
+    import plotly.io as pio
+    import Heapsort2
+    import HeapSortSYS
+    import bucketsort
+
+    values = arr.tolist()
+    heap_frames = list(heap_sort(values[:], trace=True))
+    bucket_frames = list(bucket_sort_trace(values, 5))
+    html_path = os.path.join(workdir, 'heap_sort_animation.html')
+
+    cases = {
+        ('heap_sort', 'trace'): lambda: heap_sort(values[:], trace=True),
+        ('heap_sort', 'frames'): lambda: list(heap_sort(values[:], trace=True)),
+        ('heap_sort', 'serialize'): lambda: Heapsort2.generate_animation_data(heap_frames),
+        ('heap_sort', 'serialize_binary'):
+            lambda: Heapsort2.generate_animation_data(heap_frames, format='binary'),
+        ('heap_sort', 'render'): file_output(
+            lambda: HeapSortSYS.create_animation(heap_frames, html_path, fast=True), html_path),
+        ('bucket_sort', 'trace'): lambda: bucket_sort_trace(values, 5),
+        ('bucket_sort', 'frames'): lambda: list(bucket_sort_trace(values, 5)),
+        ('bucket_sort', 'serialize'): lambda: json.dumps(bucket_frames),
+        ('bucket_sort', 'render'): lambda: fastfig.to_html(
+            bucketsort.create_animation(bucket_frames, fast=True), include_plotlyjs=False),
+    }
+    if go_render:
+        cases[('heap_sort', 'render_go')] = file_output(
+            lambda: HeapSortSYS.create_animation(heap_frames, html_path), html_path)
+        cases[('bucket_sort', 'render_go')] = lambda: pio.to_html(
+            bucketsort.create_animation(bucket_frames), include_plotlyjs=False)
+    frames = {'heap_sort': len(heap_frames), 'bucket_sort': len(bucket_frames)}
+    return cases, frames
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def result_key(result):
+    return (result['kind'], result['engine'], result['stage'], result['distribution'], result['n'])
+
+
+def compare(results, previous_file):
+    with open(previous_file) as fp:
+        previous = {result_key(result): result for result in json.load(fp)['results']}
+    regressions = 0
+    print(f"\nComparacion con {previous_file}:")
+    for result in results:
+        old = previous.get(result_key(result))
+        if old is None or max(old['seconds'], result['seconds']) < MIN_SECONDS:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        if ratio >= REGRESSION_RATIO:
+            regressions += 1
+            print(f"  REGRESION x{ratio:.2f} {result['engine']}/{result['stage']} "
+                  f"{result['distribution']} n={result['n']}")
+    print(f"  {regressions} etapas mas lentas que x{REGRESSION_RATIO}")
+    return regressions
+
+
+def parse_sizes(text):
+    return [int(size) for size in text.split(',') if size]
+
+
+def run_grid(sizes, trace_sizes, repeat, workdir, go_render):
+    results = []
+
+    def record(kind, engine, stage, distribution, n, fn, **extra):
+        result = {'kind': kind, 'engine': engine, 'stage': stage,
+                  'distribution': distribution, 'n': n, **measure(fn, repeat), **extra}
+        results.append(result)
+        size = '' if result['output_bytes'] is None else f" {result['output_bytes']}B"
+        print(f"{engine:22} {stage:16} {distribution:10} n={n:<8} {result['seconds']:.4f}s "
+              f"pico {result['peak_bytes'] / 2 ** 20:.1f}MB{size}")
+
+    for distribution in DISTRIBUTIONS:
+        for n in sizes:
+            arr = make_array(distribution, n)
+            for engine, fn in sort_cases(arr).items():
+                record('sort', engine, 'sort', distribution, n, fn)
+
+        for n in trace_sizes:
+            arr = make_array(distribution, n)
+            cases, frames = trace_cases(arr, workdir, go_render)
+            for (engine, stage), fn in cases.items():
+                record('trace', engine, stage, distribution, n, fn, frames=frames[engine])
+    return results
+
+
+def main(argv):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de ordenamiento, frames, "
+                                                 "serializacion y renderizado")
+    parser.add_argument('output', nargs='?', default='bench_sorts.json',
+                        help="Archivo JSON de resultados")
+    parser.add_argument('--sizes', type=parse_sizes, default='1000,10000,100000',
+                        help="Tamaños para los motores sin traza (separados por comas)")
+    parser.add_argument('--trace-sizes', type=parse_sizes, default='30,100',
+                        help="Tamaños para frames, serializacion y renderizado")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Repeticiones por etapa (se guarda la mejor)")
+    parser.add_argument('--go', action='store_true',
+                        help="Incluir el renderizado con graph_objects (lento)")
+    parser.add_argument('--compare', metavar='ANTERIOR',
+                        help="JSON de otra ejecucion con el que comparar")
+    args = parser.parse_args(argv)
+    output = args.output
+    repeat = args.repeat
+
+    # Renderizado sin abrir el navegador y con plotly.js en un asset aparte,
+    # para que los bytes de salida sean los de la figura
+    webbrowser.open = lambda *args, **kwargs: False
+    with tempfile.TemporaryDirectory(prefix='bench_sorts-') as workdir:
+        os.environ['PLOTLY_ASSET_DIR'] = os.path.join(workdir, 'assets')
+        results = run_grid(args.sizes, args.trace_sizes, repeat, workdir, args.go)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+    with open(output, 'w') as fp:
+        json.dump(report, fp, indent=2)
+    print(f"Resultados guardados en {output}")
+
+    if args.compare:
+        sys.exit(1 if compare(results, args.compare) else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,583 @@
+import math
+import os
+import tempfile
+from array import array
+
+import numpy as np
+
+from sortstats import phase
+
+
+def bucket_index(num, min_val, max_val, num_buckets):
+    # Normalizacion lineal min-max; si todos los valores son iguales van al bucket 0
+    if max_val == min_val:
+        return 0
+    normalized = (num - min_val) / (max_val - min_val)
+    return min(int(normalized * num_buckets), num_buckets - 1)
+
+
+def bucket_indices(arr, num_buckets, min_val=None, max_val=None, edges=None):
+    """Version vectorizada de bucket_index para un array completo.
+
+    Con edges (los num_buckets - 1 limites interiores de bucket_edges) el
+    bucket de cada valor es el numero de limites menores o iguales que el.
+    """
+    arr = np.asarray(arr)
+    if edges is not None:
+        return np.searchsorted(edges, arr, side='right')
+    if min_val is None or max_val is None:
+        lo, hi = _value_range(arr)
+        min_val = lo if min_val is None else min_val
+        max_val = hi if max_val is None else max_val
+    if not max_val > min_val:
+        # Todos iguales (o todos NaN): bucket 0; los NaN sueltos, al ultimo
+        indices = np.zeros(arr.shape, dtype=np.intp)
+        if arr.dtype.kind == 'f':
+            indices[np.isnan(arr)] = num_buckets - 1
+        return indices
+    # Mismo orden de operaciones que bucket_index, pero siempre en float64:
+    # en el dtype entero de la entrada arr - min_val se desborda. Los NaN
+    # (y cualquier redondeo fuera de rango) acaban en el ultimo bucket
+    span = float(max_val) - float(min_val)
+    normalized = (arr.astype(np.float64, copy=False) - float(min_val)) / span
+    normalized *= num_buckets
+    np.nan_to_num(normalized, copy=False, nan=num_buckets - 1)
+    np.clip(normalized, 0, num_buckets - 1, out=normalized)
+    return normalized.astype(np.intp)
+
+
+def _value_range(arr):
+    # Minimo y maximo ignorando NaN (solo son NaN si todo el array es NaN)
+    return np.fmin.reduce(arr, axis=None), np.fmax.reduce(arr, axis=None)
+
+
+def auto_num_buckets(n, bucket_size=None):
+    """Numero de buckets para n elementos: ~n / bucket_size, entre 1 y 2**16.
+
+    Sin bucket_size se usan buckets de ~sqrt(n) elementos, lo habitual para
+    las animaciones; bucket_sort usa buckets de ~2048 elementos.
+    """
+    if bucket_size is None:
+        bucket_size = math.isqrt(n)
+    return min(max(1, n // max(1, bucket_size)), 2 ** 16)
+
+
+# Estrategias para elegir los limites de los buckets
+STRATEGIES = ('uniform', 'quantile', 'histogram')
+
+
+def _histogram_edges(histogram, min_val, max_val, num_buckets, rounds=6):
+    # Limites que reparten el histograma acumulado en partes con ~n/num_buckets.
+    # histogram(bin_edges) devuelve los conteos de cada bin; los bins con mas
+    # de medio bucket se parten (en mas trozos cuanto mas llenos) y se vuelven
+    # a contar, hasta 'rounds' veces o hasta que el bin mas lleno deja de
+    # bajar dos veces seguidas, para que un pico estrecho de valores no acabe
+    # en un solo bucket
+    bin_edges = np.linspace(min_val, max_val, 16 * num_buckets + 1)
+    counts = histogram(bin_edges)
+    stalled = 0
+    for _ in range(rounds):
+        half_bucket = counts.sum() / (2 * num_buckets)
+        crowded = np.flatnonzero(counts > half_bucket)
+        pieces = np.clip(16 * counts[crowded] // max(half_bucket, 1), 16, 4096).astype(int)
+        splits = [np.linspace(bin_edges[b], bin_edges[b + 1], k + 1)
+                  for b, k in zip(crowded.tolist(), pieces.tolist())]
+        refined = np.unique(np.concatenate([bin_edges] + splits))
+        if refined.size == bin_edges.size:
+            break
+        largest = counts.max()
+        bin_edges = refined
+        counts = histogram(bin_edges)
+        stalled = stalled + 1 if counts.max() >= largest else 0
+        if stalled == 2:
+            # Seguramente valores repetidos: partir mas los bins no los separa
+            break
+    cumulative = np.cumsum(counts)
+    targets = cumulative[-1] * np.arange(1, num_buckets) / num_buckets
+    return bin_edges[np.searchsorted(cumulative, targets) + 1]
+
+
+def _sample(data, sample_size):
+    # Muestra aleatoria (con semilla fija, para que el reparto sea reproducible)
+    if data.size <= sample_size:
+        return np.asarray(data)
+    rng = np.random.default_rng(0)
+    return np.asarray(data[np.sort(rng.integers(0, data.size, sample_size))])
+
+
+def bucket_edges(arr, num_buckets, strategy='uniform', sample_size=65536,
+                 min_val=None, max_val=None):
+    """Limites interiores de los buckets segun la estrategia.
+
+    - 'uniform': normalizacion lineal min-max (el reparto de siempre);
+      devuelve None y bucket_indices usa min_val/max_val.
+    - 'quantile': cuantiles de una muestra de sample_size elementos.
+    - 'histogram': histograma de 16 bins por bucket entre el minimo y el
+      maximo (refinado donde hay picos), ecualizado para que cada bucket
+      reciba ~n/num_buckets. Es exacto, pero recorre los datos varias veces.
+
+    Con datos sesgados o agrupados 'quantile' y 'histogram' mantienen los
+    buckets equilibrados; los limites repetidos solo dejan buckets vacios.
+    Si todos los valores son iguales devuelve None, como 'uniform' (todo
+    va al bucket 0, ver bucket_indices).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"estrategia desconocida: {strategy!r} (opciones: {', '.join(STRATEGIES)})")
+    if strategy == 'uniform' or num_buckets == 1:
+        return None
+    arr = np.asarray(arr)
+    if strategy == 'quantile':
+        return np.quantile(_sample(arr, sample_size), np.arange(1, num_buckets) / num_buckets)
+    if min_val is None or max_val is None:
+        lo, hi = _value_range(arr)
+        min_val = lo if min_val is None else min_val
+        max_val = hi if max_val is None else max_val
+    if not max_val > min_val:
+        return None
+    return _histogram_edges(lambda bins: np.histogram(arr, bins)[0], min_val, max_val, num_buckets)
+
+
+def bucket_occupancy(counts):
+    """Estadisticas de ocupacion a partir del numero de elementos por bucket.
+
+    imbalance es el bucket mas grande dividido por el tamaño medio: 1.0 es
+    un reparto perfecto y num_buckets significa que todo cayo en un bucket.
+    """
+    counts = np.asarray(counts)
+    total = int(counts.sum())
+    mean = total / counts.size if counts.size else 0.0
+    largest = int(counts.max()) if counts.size else 0
+    return {
+        'num_buckets': int(counts.size),
+        'elements': total,
+        'empty': int(np.count_nonzero(counts == 0)),
+        'min': int(counts.min()) if counts.size else 0,
+        'max': largest,
+        'mean': mean,
+        'std': float(counts.std()) if counts.size else 0.0,
+        'imbalance': largest / mean if mean else 0.0,
+    }
+
+
+def _group_by_bucket(arr, num_buckets, out=None, min_val=None, max_val=None, edges=None):
+    # Agrupa arr por bucket (estable) y devuelve (agrupado, limites de cada bucket)
+    indices = bucket_indices(arr, num_buckets, min_val, max_val, edges)
+    small = indices.astype(np.uint16) if num_buckets <= 2 ** 16 else indices
+    grouped = np.take(arr, np.argsort(small, kind='stable'), out=out)
+    bounds = np.zeros(num_buckets + 1, dtype=np.intp)
+    np.cumsum(np.bincount(indices, minlength=num_buckets), out=bounds[1:])
+    return grouped, bounds
+
+
+def bucket_sort(arr, num_buckets=None, strategy='uniform', occupancy=False, stats=None):
+    """Bucket sort sin traza: devuelve un nuevo array de NumPy ordenado.
+
+    Los indices de bucket se calculan en una sola pasada vectorizada, los
+    elementos se agrupan por bucket con un argsort estable (radix sort de
+    NumPy sobre indices de 16 bits) y cada bucket se ordena como una vista
+    (slice) del array agrupado. Por defecto usa un bucket por cada ~2048
+    elementos, para que el bucle por bucket no domine.
+
+    strategy elige los limites de los buckets (ver bucket_edges). Con
+    occupancy=True devuelve (ordenado, bucket_occupancy(...)). Con stats
+    (un sortstats.SortStats) se miden las fases 'distribute' y 'combine' y
+    se guardan los tamaños de los buckets.
+    """
+    arr = np.asarray(arr)
+    n = arr.size
+    if num_buckets is None:
+        num_buckets = auto_num_buckets(n, 2048)
+    if n == 0:
+        grouped, bounds = arr.copy(), np.zeros(num_buckets + 1, dtype=np.intp)
+    else:
+        with phase(stats, 'distribute'):
+            edges = bucket_edges(arr, num_buckets, strategy)
+            grouped, bounds = _group_by_bucket(arr, num_buckets, edges=edges)
+        with phase(stats, 'combine'):
+            for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+                if end - start > 1:
+                    grouped[start:end].sort()
+
+    if stats is not None:
+        stats.algorithm = stats.algorithm or 'bucket_sort'
+        stats.n += n
+        stats.bucket_sizes = np.diff(bounds).tolist()
+    if occupancy:
+        return grouped, bucket_occupancy(np.diff(bounds))
+    return grouped
+
+
+def _sort_shared_buckets(shm_name, dtype, n, ranges):
+    # Worker: se adjunta a la memoria compartida y ordena sus buckets en su lugar
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        grouped = np.ndarray((n,), dtype=dtype, buffer=shm.buf)
+        for start, end in ranges:
+            grouped[start:end].sort()
+        del grouped
+    finally:
+        shm.close()
+
+
+def _split_buckets(bounds, parts):
+    # Reparte los buckets (no vacios) en 'parts' grupos contiguos con un
+    # numero parecido de elementos
+    n = int(bounds[-1])
+    groups = [[] for _ in range(parts)]
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        if end - start > 1:
+            part = min(parts - 1, (start + end) // 2 * parts // max(n, 1))
+            groups[part].append((start, end))
+    return [group for group in groups if group]
+
+
+def bucket_sort_parallel(arr, workers=None, num_buckets=None, executor=None, strategy='uniform'):
+    """Bucket sort con los buckets ordenados en paralelo por varios procesos.
+
+    Los elementos se agrupan por bucket directamente en un bloque de
+    memoria compartida; cada proceso recibe solo el nombre del bloque y un
+    rango de buckets contiguo, y los ordena en su lugar, sin que los datos
+    viajen por pickle. Como los buckets ya estan uno detras de otro, el
+    resultado es el propio bloque: al final solo se copia una vez a un
+    array normal para poder liberar la memoria compartida.
+
+    executor permite reutilizar un ProcessPoolExecutor entre llamadas;
+    strategy elige los limites de los buckets (ver bucket_edges).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    arr = np.asarray(arr)
+    n = arr.size
+    workers = workers or os.cpu_count() or 1
+    if num_buckets is None:
+        num_buckets = max(workers, auto_num_buckets(n, 2048))
+    if n == 0 or workers == 1:
+        return bucket_sort(arr, num_buckets, strategy)
+
+    shm = shared_memory.SharedMemory(create=True, size=arr.nbytes)
+    try:
+        grouped = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+        edges = bucket_edges(arr, num_buckets, strategy)
+        _, bounds = _group_by_bucket(arr, num_buckets, out=grouped, edges=edges)
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(_sort_shared_buckets, shm.name, arr.dtype.str, n, ranges)
+                       for ranges in _split_buckets(bounds, workers)]
+            for future in futures:
+                future.result()
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        result = grouped.copy()
+        del grouped
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
+
+
+# Maximo de runs abiertos a la vez en cada nivel de bucket_sort_file
+MAX_RUNS = 256
+
+
+def _chunks(data, chunk_items):
+    for start in range(0, data.size, chunk_items):
+        yield np.asarray(data[start:start + chunk_items])
+
+
+def _external_sort(data, out, offset, chunk_items, memory_bytes, workdir, strategy):
+    # Ordena data (normalmente un np.memmap) y lo escribe en out[offset:]
+    n = data.size
+    if n * data.itemsize <= memory_bytes // 2:
+        out[offset:offset + n] = np.sort(np.asarray(data), kind='stable')
+        return
+
+    # Pasada secuencial para el minimo y el maximo (sin contar los NaN)
+    min_val = max_val = None
+    nans = 0
+    for chunk in _chunks(data, chunk_items):
+        lo, hi = _value_range(chunk)
+        min_val = lo if min_val is None else np.fmin(min_val, lo)
+        max_val = hi if max_val is None else np.fmax(max_val, hi)
+        if chunk.dtype.kind == 'f':
+            nans += int(np.count_nonzero(np.isnan(chunk)))
+    if not max_val > min_val and nans in (0, n):
+        # Todo igual o todo NaN: ya esta ordenado. Con algun NaN suelto se
+        # reparte igualmente (bucket_indices los manda al ultimo bucket)
+        for start, chunk in zip(range(offset, offset + n, chunk_items), _chunks(data, chunk_items)):
+            out[start:start + chunk.size] = chunk
+        return
+
+    # Se piden runs de ~1/4 de la memoria para que un reparto irregular aun quepa
+    run_items = max(1, memory_bytes // (4 * data.itemsize))
+    num_buckets = min(max(2, -(-n // run_items)), MAX_RUNS)
+    edges = None
+    if strategy == 'quantile':
+        edges = bucket_edges(_sample(data, 65536), num_buckets, strategy)
+    elif strategy == 'histogram':
+        # Cada histograma es otra pasada secuencial sobre los bloques
+        edges = _histogram_edges(
+            lambda bins: sum(np.histogram(chunk, bins)[0] for chunk in _chunks(data, chunk_items)),
+            min_val, max_val, num_buckets)
+    if edges is not None and edges[0] == edges[-1]:
+        # Con datos muy repetidos todos los limites pueden caer en el mismo
+        # valor y mandar todo a un bucket: este nivel usa limites min-max
+        edges = None
+
+    # Distribucion: cada bucket se añade a su propio run en disco
+    level_dir = tempfile.mkdtemp(dir=workdir)
+    paths = [os.path.join(level_dir, f'run-{b}.bin') for b in range(num_buckets)]
+    runs = [open(path, 'wb') for path in paths]
+    try:
+        for chunk in _chunks(data, chunk_items):
+            grouped, bounds = _group_by_bucket(chunk, num_buckets, None, min_val, max_val, edges)
+            for b in np.flatnonzero(np.diff(bounds)).tolist():
+                runs[b].write(grouped[bounds[b]:bounds[b + 1]].tobytes())
+    finally:
+        for run in runs:
+            run.close()
+
+    # Cada run se ordena por separado (recursivamente si aun es demasiado
+    # grande) y se escribe a continuacion del anterior
+    for path in paths:
+        size = os.path.getsize(path) // data.itemsize
+        if size:
+            run = np.memmap(path, dtype=data.dtype, mode='r', shape=(size,))
+            # Si un run recibio todo el nivel, reintentar con limites min-max
+            # (siempre separan el minimo del maximo) para no recursar sin fin
+            run_strategy = 'uniform' if size == n else strategy
+            _external_sort(run, out, offset, chunk_items, memory_bytes, level_dir, run_strategy)
+            del run
+            offset += size
+        os.unlink(path)
+    os.rmdir(level_dir)
+
+
+def bucket_sort_file(input_path, output_path, dtype='float64',
+                     memory_bytes=256 * 2 ** 20, tmp_dir=None, strategy='uniform'):
+    """Bucket sort externo para archivos binarios mas grandes que la RAM.
+
+    El archivo de entrada (valores dtype sin cabecera, como los escribe
+    ndarray.tofile) se lee como np.memmap en bloques secuenciales: una
+    pasada calcula el minimo y el maximo y otra reparte cada bloque en un
+    run por bucket en tmp_dir. Despues cada run se carga, se ordena en
+    memoria y se escribe en orden en el archivo de salida, tambien mapeado
+    en memoria. Los runs que no caben en memory_bytes (datos muy sesgados)
+    se vuelven a repartir con su propio minimo y maximo. Con strategy
+    'quantile' o 'histogram' (ver bucket_edges) los runs salen equilibrados
+    aunque los datos esten sesgados.
+
+    memory_bytes acota los datos que se tienen cargados a la vez. Devuelve
+    el numero de elementos ordenados.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"estrategia desconocida: {strategy!r} (opciones: {', '.join(STRATEGIES)})")
+    dtype = np.dtype(dtype)
+    size = os.path.getsize(input_path)
+    if size % dtype.itemsize:
+        raise ValueError(f'{input_path}: el tamaño no es multiplo de {dtype.itemsize} bytes')
+    n = size // dtype.itemsize
+    if n == 0:
+        open(output_path, 'wb').close()
+        return 0
+
+    # Bloques de ~1/8 de la memoria: el bloque, su copia agrupada y los indices
+    chunk_items = max(1, memory_bytes // (8 * dtype.itemsize))
+    data = np.memmap(input_path, dtype=dtype, mode='r', shape=(n,))
+    out = np.memmap(output_path, dtype=dtype, mode='w+', shape=(n,))
+    try:
+        with tempfile.TemporaryDirectory(dir=tmp_dir) as workdir:
+            _external_sort(data, out, 0, chunk_items, memory_bytes, workdir, strategy)
+        out.flush()
+    finally:
+        del data, out
+    return n
+
+
+class BucketTrace:
+    """Traza compacta de bucket sort: valores iniciales + log de eventos.
+
+    En lugar de copiar todos los buckets en cada paso se guardan, en
+    array.array, las colocaciones (indice del elemento, bucket) de la fase
+    de distribucion y el orden en que cada bucket se ordena y se combina.
+    Los frames ({'arr', 'buckets', 'stage', 'current'}) se reconstruyen
+    bajo demanda al iterar o indexar.
+    """
+
+    def __init__(self, arr, num_buckets, include_initial=True):
+        self.values = arr.tolist() if hasattr(arr, 'tolist') else list(arr)
+        self.num_buckets = num_buckets
+        self.include_initial = include_initial
+        self.placements = array('q')  # pares (indice del elemento, bucket)
+        self.merges = array('q')      # buckets en el orden en que se combinan
+
+    def place(self, i, bucket):
+        self.placements.extend((i, bucket))
+
+    def merge(self, bucket):
+        self.merges.append(bucket)
+
+    def frames_at(self, indices):
+        """Frames en los indices dados (en orden creciente) con una sola pasada."""
+        frames = []
+        buckets = [[] for _ in range(self.num_buckets)]
+        sorted_arr = []
+        placed = len(self.placements) // 2
+        offset = int(self.include_initial)
+        done = 0
+        for index in indices:
+            if index < offset:
+                frames.append(self._frame(buckets, 'initial', -1))
+                continue
+            event = index - offset
+            while done <= event:
+                if done < placed:
+                    buckets[self.placements[2 * done + 1]].append(self.values[self.placements[2 * done]])
+                else:
+                    bucket = self.merges[done - placed]
+                    buckets[bucket].sort()
+                    sorted_arr.extend(buckets[bucket])
+                done += 1
+            if event < placed:
+                frames.append(self._frame(buckets, 'distribute', self.placements[2 * event]))
+            else:
+                frames.append(self._combined(buckets, sorted_arr))
+        return frames
+
+    def frame_weights(self):
+        # Posiciones que cambian en cada frame: 1 por colocacion y el tamaño
+        # del bucket en cada combinacion
+        sizes = np.bincount(np.frombuffer(self.placements, dtype=np.int64)[1::2],
+                            minlength=self.num_buckets)
+        return ([0] * int(self.include_initial) + [1] * (len(self.placements) // 2)
+                + [int(sizes[bucket]) for bucket in self.merges])
+
+    def phase_boundaries(self):
+        """Indices de frame que delimitan las fases (inicial, distribute, combine)."""
+        offset = int(self.include_initial)
+        placed = len(self.placements) // 2
+        return sorted({0, offset, offset + placed - 1, offset + placed, len(self) - 1})
+
+    def occupancy(self):
+        """Estadisticas de ocupacion de los buckets (ver bucket_occupancy)."""
+        buckets = np.frombuffer(self.placements, dtype=np.int64)[1::2]
+        return bucket_occupancy(np.bincount(buckets, minlength=self.num_buckets))
+
+    def __len__(self):
+        return int(self.include_initial) + len(self.placements) // 2 + len(self.merges)
+
+    def _frame(self, buckets, stage, current, arr=None):
+        return {
+            'arr': self.values.copy() if arr is None else arr,
+            'buckets': [bucket.copy() for bucket in buckets],
+            'stage': stage,
+            'current': current
+        }
+
+    def _combined(self, buckets, sorted_arr):
+        padding = [0] * (len(self.values) - len(sorted_arr))
+        return self._frame(buckets, 'combine', len(sorted_arr) - 1, sorted_arr + padding)
+
+    def __iter__(self):
+        buckets = [[] for _ in range(self.num_buckets)]
+        if self.include_initial:
+            yield self._frame(buckets, 'initial', -1)
+
+        for k in range(0, len(self.placements), 2):
+            i, bucket = self.placements[k], self.placements[k + 1]
+            buckets[bucket].append(self.values[i])
+            yield self._frame(buckets, 'distribute', i)
+
+        sorted_arr = []
+        for bucket in self.merges:
+            buckets[bucket].sort()
+            sorted_arr.extend(buckets[bucket])
+            yield self._combined(buckets, sorted_arr)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('frame index out of range')
+
+        buckets = [[] for _ in range(self.num_buckets)]
+        if self.include_initial:
+            if index == 0:
+                return self._frame(buckets, 'initial', -1)
+            index -= 1
+
+        placed = len(self.placements) // 2
+        for k in range(min(index + 1, placed)):
+            buckets[self.placements[2 * k + 1]].append(self.values[self.placements[2 * k]])
+        if index < placed:
+            return self._frame(buckets, 'distribute', self.placements[2 * index])
+
+        sorted_arr = []
+        for bucket in self.merges[:index - placed + 1]:
+            buckets[bucket].sort()
+            sorted_arr.extend(buckets[bucket])
+        return self._combined(buckets, sorted_arr)
+
+
+def bucket_sort_trace(arr, num_buckets=5, include_initial=True, strategy='uniform', stats=None):
+    """Bucket sort animable: devuelve un BucketTrace en lugar de una lista de frames.
+
+    Con num_buckets=None el numero de buckets se elige con auto_num_buckets;
+    strategy elige los limites de los buckets (ver bucket_edges). Con stats
+    se mide la fase 'distribute' y se guardan los tamaños de los buckets y
+    el numero de frames (el ordenamiento de cada bucket ocurre al recorrer
+    la traza).
+    """
+    if num_buckets is None:
+        num_buckets = auto_num_buckets(len(arr))
+    trace = BucketTrace(arr, num_buckets, include_initial)
+    with phase(stats, 'distribute'):
+        if len(trace.values):
+            values = np.asarray(trace.values)
+            indices = bucket_indices(values, num_buckets, edges=bucket_edges(values, num_buckets, strategy))
+            pairs = np.empty(2 * len(indices), dtype=np.int64)
+            pairs[0::2] = np.arange(len(indices))
+            pairs[1::2] = indices
+            trace.placements.frombytes(pairs.tobytes())
+        for bucket in range(num_buckets):
+            trace.merge(bucket)
+
+    if stats is not None:
+        stats.algorithm = stats.algorithm or 'bucket_sort'
+        stats.n += len(trace.values)
+        stats.frames += len(trace)
+        buckets = np.frombuffer(trace.placements, dtype=np.int64)[1::2]
+        stats.bucket_sizes = np.bincount(buckets, minlength=num_buckets).tolist()
+    return trace
+
+
+def iter_bucket_sort_frames(arr, num_buckets=5, include_initial=True, strategy='uniform'):
+    """Generador de los frames de bucket sort, entregados a medida que se producen.
+
+    Cada frame es {'arr', 'buckets', 'stage', 'current'}, igual que los de
+    bucket_sort_with_animation, pero no se guarda la lista completa.
+    """
+    yield from bucket_sort_trace(arr, num_buckets, include_initial, strategy)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python bucketcore.py entrada.bin salida.bin [dtype] [memoria_MB] [estrategia]
+    if len(sys.argv) < 3:
+        print("Uso: python bucketcore.py entrada.bin salida.bin [dtype] [memoria_MB] [estrategia]")
+        sys.exit(1)
+    dtype = sys.argv[3] if len(sys.argv) > 3 else 'float64'
+    memory = int(sys.argv[4]) * 2 ** 20 if len(sys.argv) > 4 else 256 * 2 ** 20
+    strategy = sys.argv[5] if len(sys.argv) > 5 else 'uniform'
+    print(bucket_sort_file(sys.argv[1], sys.argv[2], dtype, memory, strategy=strategy),
+          "elementos ordenados")
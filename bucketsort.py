@@ -1,96 +1,72 @@
 import plotly.graph_objects as go
 import numpy as np
 import plotly.io as pio
+from animstream import write_html_stream
+from fastfig import figure_dict, html_size, to_html
+from plotlyasset import plotlyjs_include
+from rendercache import cache_key, get_cache
+from bucketcore import bucket_sort_trace
+from keyframes import json_size, sample_trace
+from sortstats import SortStats, phase, stats_enabled
+
+def bucket_sort_with_animation(arr, num_buckets=5, strategy='uniform', stats=None,
+                               max_frames=None, max_bytes=None, sampling='uniform', overhead=0):
+    # strategy: 'uniform', 'quantile' o 'histogram' (ver bucketcore.bucket_edges);
+    # stats: sortstats.SortStats opcional (tamaños de los buckets, tiempos por fase).
+    # Con max_frames / max_bytes se devuelve solo una muestra de los frames
+    # (sampling 'uniform' o 'weighted', ver keyframes.sample_trace); overhead
+    # son los bytes fijos de la salida (ver fragment_overhead y page_overhead)
+    trace = bucket_sort_trace(arr, num_buckets, strategy=strategy, stats=stats)
+    if max_frames is None and max_bytes is None:
+        return trace
+    return sample_trace(trace, max_frames, max_bytes, sampling, stats=stats, overhead=overhead,
+                        frame_size=lambda frame: json_size([array_trace_dict(frame),
+                                                            buckets_annotation(frame)]))
+
+COLOR_MAP = {
+    'default': 'rgb(173, 216, 230)', 
+    'active': 'rgb(255, 182, 193)', 
+}
+
+def array_trace_dict(frame):
+    colors = [COLOR_MAP['default'] for _ in frame['arr']]
+    if frame['stage'] in ['distribute', 'combine']:
+        colors[frame['current']] = COLOR_MAP['active']
+    return dict(
+        type='bar',
+        y=frame['arr'],
+        marker=dict(color=colors),
+        text=[str(x) for x in frame['arr']],
+        textposition='outside',
+        hoverinfo='text'
+    )
 
-def bucket_sort_with_animation(arr, num_buckets=5):
-    frames = []
-    n = len(arr)
-    min_val, max_val = np.min(arr), np.max(arr)
-    buckets = [[] for _ in range(num_buckets)]
-    
-    frames.append({
-        'arr': arr.tolist(),
-        'buckets': [[] for _ in range(num_buckets)],
-        'stage': 'initial',
-        'current': -1
-    })
-    
-    for i, num in enumerate(arr):
-        normalized = (num - min_val) / (max_val - min_val)
-        index = min(int(normalized * num_buckets), num_buckets - 1)
-        buckets[index].append(num)
-        frames.append({
-            'arr': arr.tolist(),
-            'buckets': [bucket.copy() for bucket in buckets],
-            'stage': 'distribute',
-            'current': i
-        })
-    sorted_arr = []
-    for i, bucket in enumerate(buckets):
-        bucket.sort()
-        sorted_arr.extend(bucket)
-        frames.append({
-            'arr': sorted_arr + [0] * (n - len(sorted_arr)),
-            'buckets': [bucket.copy() for bucket in buckets],
-            'stage': 'combine',
-            'current': len(sorted_arr) - 1
-        })
-    return frames
-
-def create_animation(frames):
-    fig = go.Figure()
-
-    max_val = max(max(frame['arr']) for frame in frames)
-    color_map = {
-        'default': 'rgb(173, 216, 230)', 
-        'active': 'rgb(255, 182, 193)', 
-    }
-
-    def create_array_trace(frame):
-        colors = [color_map['default'] for _ in frame['arr']]
-        if frame['stage'] in ['distribute', 'combine']:
-            colors[frame['current']] = color_map['active']
-        return go.Bar(
-            y=frame['arr'],
-            marker_color=colors,
-            text=[str(x) for x in frame['arr']],
-            textposition='outside',
-            hoverinfo='text'
-        )
-
-    def create_buckets_text(frame):
-        buckets_text = ""
-        for i, bucket in enumerate(frame['buckets']):
-            buckets_text += f"Bucket {i+1}: {', '.join(map(str, bucket)) if bucket else 'Vacío'}<br>"
-        return f"<b>Estado de los buckets:</b><br>{buckets_text}"
+def create_array_trace(frame):
+    return go.Bar(array_trace_dict(frame))
 
-    fig.add_trace(create_array_trace(frames[0]))
+def create_buckets_text(frame):
+    buckets_text = ""
+    for i, bucket in enumerate(frame['buckets']):
+        buckets_text += f"Bucket {i+1}: {', '.join(map(str, bucket)) if bucket else 'Vacío'}<br>"
+    return f"<b>Estado de los buckets:</b><br>{buckets_text}"
 
-    fig_frames = []
-    for i, frame in enumerate(frames):
-        frame_data = [create_array_trace(frame)]
-        frame_layout = go.Layout(
-            annotations=[
-                dict(
-                    text=create_buckets_text(frame),
-                    xref="paper", yref="paper",
-                    x=0.5, y=-0.4,
-                    showarrow=False,
-                    font=dict(size=14, color="black"),
-                    align="center",
-                    bgcolor="rgba(255, 255, 255, 0.9)",
-                    bordercolor="rgba(0, 0, 0, 0.5)",
-                    borderwidth=2,
-                    opacity=0.9
-                )
-            ]
-        )
-        fig_frames.append(go.Frame(data=frame_data, layout=frame_layout, name=str(i)))
-
-    fig.frames = fig_frames
+def buckets_annotation(frame):
+    return dict(
+        text=create_buckets_text(frame),
+        xref="paper", yref="paper",
+        x=0.5, y=-0.4,
+        showarrow=False,
+        font=dict(size=14, color="black"),
+        align="center",
+        bgcolor="rgba(255, 255, 255, 0.9)",
+        bordercolor="rgba(0, 0, 0, 0.5)",
+        borderwidth=2,
+        opacity=0.9
+    )
 
-    fig.update_layout(
-        title='Animación de Bucket Sort',
+def animation_layout(first_frame, max_val):
+    return dict(
+        title=dict(text='Animación de Bucket Sort'),
         updatemenus=[dict(
             type='buttons',
             showactive=False,
@@ -101,40 +77,138 @@ def create_animation(frames):
                                            mode='immediate')])]
         )],
         height=700,
-        margin=dict(l=20, r=20, t=100, b=200)
+        margin=dict(l=20, r=20, t=100, b=200),
+        annotations=[buckets_annotation(first_frame)],
+        yaxis=dict(range=[0, max_val * 1.1])
     )
 
-    fig.add_annotation(
-        text=create_buckets_text(frames[0]),
-        xref="paper", yref="paper",
-        x=0.5, y=-0.4,
-        showarrow=False,
-        font=dict(size=14, color="black"),
-        align="center",
-        bgcolor="rgba(255, 255, 255, 0.9)",
-        bordercolor="rgba(0, 0, 0, 0.5)",
-        borderwidth=2,
-        opacity=0.9
+def animation_figure_dict(frames):
+    # Misma figura que create_animation, construida con dicts planos
+    max_val = max(max(frame['arr']) for frame in frames)
+    return figure_dict(
+        data=[array_trace_dict(frames[0])],
+        layout=animation_layout(frames[0], max_val),
+        frames=[{'data': [array_trace_dict(frame)],
+                 'layout': {'annotations': [buckets_annotation(frame)]},
+                 'name': str(i)} for i, frame in enumerate(frames)]
     )
 
-    fig.update_yaxes(range=[0, max_val * 1.1])
+def create_animation(frames, fast=False):
+    # Con fast=True devuelve un dict (usar fastfig.to_html para convertirlo)
+    if fast:
+        return animation_figure_dict(frames)
 
-    return fig
+    fig = go.Figure()
 
-# Generar un arreglo aleatorio
-arr = np.random.permutation(100)[:9]
-print(f"Arreglo generado: {arr}")
+    max_val = max(max(frame['arr']) for frame in frames)
+
+    fig.add_trace(create_array_trace(frames[0]))
+
+    fig_frames = []
+    for i, frame in enumerate(frames):
+        frame_data = [create_array_trace(frame)]
+        frame_layout = go.Layout(annotations=[buckets_annotation(frame)])
+        fig_frames.append(go.Frame(data=frame_data, layout=frame_layout, name=str(i)))
 
-# Crear los frames de la animación
-frames = bucket_sort_with_animation(arr, num_buckets=5)
+    fig.frames = fig_frames
 
-# Crear la figura de la animación
-animation_figure = create_animation(frames)
+    fig.update_layout(animation_layout(frames[0], max_val))
 
-# Convertir la figura a una cadena HTML y guardarla en una variable
-html_content = pio.to_html(animation_figure, 
-                           include_plotlyjs=True, 
-                           full_html=False, 
-                           config={'staticPlot': False, 'responsive': True, 'displayModeBar': False})
+    return fig
 
-print("Contenido HTML generado como cadena para 'html_content'")
+HTML_CONFIG = {'staticPlot': False, 'responsive': True, 'displayModeBar': False}
+
+def create_animation_stream(frames, fp):
+    # Escribe el fragmento HTML en fp a medida que llegan los frames
+    # (acepta un generador como iter_bucket_sort_frames)
+    def layout(first_frame, last_frame, max_val):
+        return figure_dict([], animation_layout(first_frame, max_val))['layout']
+
+    def frame_layout(frame):
+        return {'annotations': [buckets_annotation(frame)]}
+
+    write_html_stream(fp, frames, array_trace_dict, layout, frame_layout,
+                      config=HTML_CONFIG, include_plotlyjs=plotlyjs_include(),
+                      full_html=False)
+
+def _initial_figure(arr, num_buckets):
+    first = {'arr': list(arr), 'buckets': [[] for _ in range(num_buckets)],
+             'stage': 'initial', 'current': -1}
+    return figure_dict([array_trace_dict(first)], animation_layout(first, max(arr)))
+
+def fragment_overhead(arr, num_buckets=5):
+    # Bytes del fragmento que no dependen del numero de frames (plotly.js si
+    # va incrustado, layout y la traza inicial)
+    return html_size(_initial_figure(arr, num_buckets), include_plotlyjs=plotlyjs_include(),
+                     full_html=False, config=HTML_CONFIG)
+
+def page_overhead(arr, num_buckets=5, include_plotlyjs=True):
+    # Igual que fragment_overhead pero para una pagina HTML completa
+    # (include_plotlyjs como en to_html, ver plotlyasset.plotlyjs_include)
+    return html_size(_initial_figure(arr, num_buckets), include_plotlyjs=include_plotlyjs,
+                     config=HTML_CONFIG)
+
+def animation_fragment(arr, num_buckets=5, strategy='uniform', max_frames=None, max_bytes=None):
+    # Fragmento HTML de la animación para un arreglo dado, construido con
+    # dicts planos y guardado en la cache de render (lo usa dispatcher.py).
+    # max_bytes es el tamaño de todo el fragmento, no solo de los frames
+    cache = get_cache()
+    key = cache_key('bucketsort', arr, {'num_buckets': num_buckets, 'strategy': strategy,
+                                        'fast': True, 'plotlyjs': plotlyjs_include(),
+                                        'max_frames': max_frames, 'max_bytes': max_bytes})
+    html = cache.get(key)
+    if html is None:
+        overhead = fragment_overhead(arr, num_buckets) if max_bytes is not None else 0
+        frames = list(bucket_sort_with_animation(arr, num_buckets, strategy, max_frames=max_frames,
+                                                 max_bytes=max_bytes, overhead=overhead))
+        html = to_html(animation_figure_dict(frames), include_plotlyjs=plotlyjs_include(),
+                       full_html=False, config=HTML_CONFIG).encode('utf-8')
+        cache.put(key, html)
+    return html.decode('utf-8')
+
+def demo_html(arr, stats=None):
+    # HTML de la animación de ejemplo (graph_objects, 5 buckets); se reutiliza
+    # si este mismo arreglo ya se renderizó (ver rendercache)
+    render_cache = get_cache()
+    cache_id = cache_key('bucketsort', arr, {'num_buckets': 5, 'plotlyjs': plotlyjs_include()})
+    cached_html = render_cache.get(cache_id)
+    if cached_html is not None:
+        return cached_html.decode('utf-8')
+
+    # Crear los frames de la animación
+    frames = bucket_sort_with_animation(arr, num_buckets=5, stats=stats)
+
+    with phase(stats, 'render'):
+        # Crear la figura de la animación
+        animation_figure = create_animation(frames)
+
+        # Convertir la figura a una cadena HTML
+        html_content = pio.to_html(animation_figure, 
+                                   include_plotlyjs=plotlyjs_include(), 
+                                   full_html=False, 
+                                   config=HTML_CONFIG)
+    render_cache.put(cache_id, html_content.encode('utf-8'))
+    return html_content
+
+def __getattr__(name):
+    # bucketsort.html_content: la animación de ejemplo de un arreglo aleatorio,
+    # generada la primera vez que se pide y no al importar el módulo
+    if name == 'html_content':
+        html_content = demo_html(np.random.permutation(100)[:9])
+        globals()['html_content'] = html_content
+        return html_content
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == "__main__":
+    # Generar un arreglo aleatorio
+    arr = np.random.permutation(100)[:9]
+    print(f"Arreglo generado: {arr}")
+
+    stats = SortStats('bucketsort') if stats_enabled() else None
+    html_content = demo_html(arr, stats=stats)
+
+    if stats is not None:
+        stats.cache = get_cache().stats()
+        stats.emit()
+
+    print("Contenido HTML generado como cadena para 'html_content'")
@@ -1,82 +1,65 @@
 import plotly.graph_objects as go
 import numpy as np
 import plotly.io as pio
+from animstream import write_html_stream
+from fastfig import figure_dict, to_html
+from plotlyasset import plotlyjs_include
+from rendercache import cache_key, get_cache
+from bucketcore import bucket_sort_trace
+from keyframes import json_size, sample_trace
+from sortstats import SortStats, phase, stats_enabled
 
 # Función para realizar el algoritmo de Bucket Sort y generar los frames de la animación
-def bucket_sort_with_animation(arr, num_buckets=5):
-    frames = []  # Lista para almacenar los frames de la animación
-    n = len(arr)  # Longitud del arreglo
-    min_val, max_val = np.min(arr), np.max(arr)  # Valores mínimo y máximo del arreglo
-    buckets = [[] for _ in range(num_buckets)]  # Crear 'num_buckets' buckets vacíos
-
-    # Distribuir los elementos en los buckets
-    for i, num in enumerate(arr):
-        # Normalizar el valor del número para ubicarlo en el bucket correcto
-        normalized = (num - min_val) / (max_val - min_val)
-        index = min(int(normalized * num_buckets), num_buckets - 1)
-        buckets[index].append(num)  # Agregar el número al bucket correspondiente
-
-        # Guardar el estado actual del proceso (para la animación)
-        frames.append({
-            'arr': arr.copy(),  # Copia del arreglo en su estado actual
-            'buckets': [bucket.copy() for bucket in buckets],  # Copia del estado actual de los buckets
-            'stage': 'distribute',  # Fase de distribución (distribuir números en buckets)
-            'current': i  # Índice del elemento actual que se está distribuyendo
-        })
-
-    sorted_arr = []  # Lista para almacenar el arreglo ordenado
-
-    # Combinar los buckets y ordenarlos
-    for i, bucket in enumerate(buckets):
-        bucket.sort()  # Ordenar los elementos dentro de cada bucket
-        sorted_arr.extend(bucket)  # Agregar los elementos ordenados al arreglo final
-
-        # Guardar el estado actual del proceso (para la animación)
-        frames.append({
-            'arr': np.array(sorted_arr + [0] * (n - len(sorted_arr))),  # Estado actual del arreglo ordenado
-            'buckets': [bucket.copy() for bucket in buckets],  # Copia del estado actual de los buckets
-            'stage': 'combine',  # Fase de combinación (los buckets se combinan)
-            'current': len(sorted_arr) - 1  # Índice del último elemento que fue combinado
-        })
-
-    return frames  # Retornar los frames para la animación
-
-# Función para crear la animación basada en los frames generados
-def create_animation(frames, output_file='bucket_sort_animation.html'):
-    fig = go.Figure()  # Crear la figura para la animación
-
-    max_val = max(np.max(frame['arr']) for frame in frames)  # Encontrar el valor máximo en todos los frames para ajustar el eje Y
-    color_map = {
-        'default': 'rgb(173, 216, 230)',  # Color por defecto (azul claro)
-        'active': 'rgb(255, 182, 193)',  # Color para el elemento activo (rosa claro)
-    }
-
-    # Función interna para crear una traza de barras para representar el arreglo
-    def create_array_trace(frame):
-        colors = [color_map['default'] for _ in frame['arr']]  # Colorear todas las barras por defecto
-        if frame['stage'] in ['distribute', 'combine']:  # Si estamos en la fase de distribuir o combinar
-            colors[frame['current']] = color_map['active']  # Colorear el elemento actual de color activo
-        return go.Bar(
-            y=frame['arr'],  # Valores del arreglo que se muestran en las barras
-            marker_color=colors,  # Colores para las barras
-            text=[str(x) for x in frame['arr']],  # Texto que muestra el valor de cada barra
-            textposition='outside',  # Posición del texto (fuera de la barra)
-            hoverinfo='text'  # Información que se muestra al pasar el mouse por encima
-        )
-
-    # Función interna para crear el texto que muestra el estado de los buckets
-    def create_buckets_text(frame):
-        buckets_text = ""
-        for i, bucket in enumerate(frame['buckets']):
-            # Texto para mostrar el contenido de cada bucket
-            buckets_text += f"Bucket {i+1}: {', '.join(map(str, bucket)) if bucket else 'Vacío'}<br>"
-        return f"<b>Estado de los buckets:</b><br>{buckets_text}"  # Devolver el texto final
-
-    fig.add_trace(create_array_trace(frames[0]))  # Agregar la primera traza del arreglo
+def bucket_sort_with_animation(arr, num_buckets=5, strategy='uniform', stats=None,
+                               max_frames=None, max_bytes=None, sampling='uniform'):
+    # Traza compacta (bucketcore.BucketTrace): los frames de distribución y
+    # combinación se reconstruyen a partir del log de eventos al recorrerla.
+    # strategy: 'uniform', 'quantile' o 'histogram' (ver bucketcore.bucket_edges);
+    # stats: sortstats.SortStats opcional (tamaños de los buckets, tiempos por fase).
+    # Con max_frames / max_bytes se devuelve solo una muestra de los frames
+    # (sampling 'uniform' o 'weighted', ver keyframes.sample_trace)
+    trace = bucket_sort_trace(arr, num_buckets, include_initial=False, strategy=strategy,
+                              stats=stats)
+    if max_frames is None and max_bytes is None:
+        return trace
+    return sample_trace(trace, max_frames, max_bytes, sampling, stats=stats,
+                        frame_size=lambda frame: json_size(array_trace_dict(frame)))
+
+color_map = {
+    'default': 'rgb(173, 216, 230)',  # Color por defecto (azul claro)
+    'active': 'rgb(255, 182, 193)',  # Color para el elemento activo (rosa claro)
+}
+
+# Función para crear la traza de barras (como dict plano) que representa el arreglo
+def array_trace_dict(frame):
+    colors = [color_map['default'] for _ in frame['arr']]  # Colorear todas las barras por defecto
+    if frame['stage'] in ['distribute', 'combine']:  # Si estamos en la fase de distribuir o combinar
+        colors[frame['current']] = color_map['active']  # Colorear el elemento actual de color activo
+    return dict(
+        type='bar',
+        y=frame['arr'],  # Valores del arreglo que se muestran en las barras
+        marker=dict(color=colors),  # Colores para las barras
+        text=[str(x) for x in frame['arr']],  # Texto que muestra el valor de cada barra
+        textposition='outside',  # Posición del texto (fuera de la barra)
+        hoverinfo='text'  # Información que se muestra al pasar el mouse por encima
+    )
 
-    # Añadir anotación para mostrar el estado de los buckets
-    fig.add_annotation(
-        text=create_buckets_text(frames[0]),
+# Función para crear la traza de barras como objeto de plotly
+def create_array_trace(frame):
+    return go.Bar(array_trace_dict(frame))
+
+# Función para crear el texto que muestra el estado de los buckets
+def create_buckets_text(frame):
+    buckets_text = ""
+    for i, bucket in enumerate(frame['buckets']):
+        # Texto para mostrar el contenido de cada bucket
+        buckets_text += f"Bucket {i+1}: {', '.join(map(str, bucket)) if bucket else 'Vacío'}<br>"
+    return f"<b>Estado de los buckets:</b><br>{buckets_text}"  # Devolver el texto final
+
+# Anotación que muestra el estado de los buckets debajo del gráfico
+def buckets_annotation(frame):
+    return dict(
+        text=create_buckets_text(frame),
         xref="paper", yref="paper",
         x=0.5, y=-0.4,  # Posición de la anotación
         showarrow=False,
@@ -88,34 +71,11 @@ def create_animation(frames, output_file='bucket_sort_animation.html'):
         opacity=0.9
     )
 
-    fig_frames = []  # Lista de frames para la animación
-    for i, frame in enumerate(frames):
-        frame_data = [create_array_trace(frame)]  # Crear la traza para el frame actual
-        fig_frames.append(go.Frame(data=frame_data, name=str(i)))  # Añadir el frame a la animación
-
-        # Actualizar la anotación para cada frame
-        fig.update_layout(
-            annotations=[
-                dict(
-                    text=create_buckets_text(frame),  # Texto para mostrar el estado actual de los buckets
-                    xref="paper", yref="paper",
-                    x=0.5, y=-0.4,
-                    showarrow=False,
-                    font=dict(size=14, color="black"),
-                    align="center",
-                    bgcolor="rgba(255, 255, 255, 0.9)",
-                    bordercolor="rgba(0, 0, 0, 0.5)",
-                    borderwidth=2,
-                    opacity=0.9
-                )
-            ]
-        )
-
-    fig.frames = fig_frames  # Asignar los frames a la figura
-
-    # Configurar el layout y los controles de la animación
-    fig.update_layout(
-        title='Bucket Sort Animation',
+# Layout y controles de la animación
+def animation_layout(last_frame, max_val):
+    return dict(
+        annotations=[buckets_annotation(last_frame)],  # Estado de los buckets del último frame
+        title=dict(text='Bucket Sort Animation'),
         updatemenus=[dict(
             type='buttons',
             showactive=False,
@@ -126,15 +86,70 @@ def create_animation(frames, output_file='bucket_sort_animation.html'):
                                         mode='immediate')])]
         )],
         height=700,  # Altura del gráfico
-        margin=dict(l=20, r=20, t=100, b=200)  # Márgenes del gráfico
+        margin=dict(l=20, r=20, t=100, b=200),  # Márgenes del gráfico
+        yaxis=dict(range=[0, max_val * 1.1])  # Ajustar el eje Y en función del valor máximo
     )
 
-    fig.update_yaxes(range=[0, max_val * 1.1])  # Ajustar el eje Y en función del valor máximo
+# Misma figura que create_animation, construida con dicts planos (sin validación de plotly)
+def animation_figure_dict(frames):
+    max_val = max(np.max(frame['arr']) for frame in frames)
+    return figure_dict(
+        data=[array_trace_dict(frames[0])],
+        layout=animation_layout(frames[-1], max_val),
+        frames=[{'data': [array_trace_dict(frame)], 'name': str(i)} for i, frame in enumerate(frames)]
+    )
+
+# Función para crear la animación basada en los frames generados
+def create_animation(frames, output_file='bucket_sort_animation.html', fast=False):
+    print(animation_html(frames, fast=fast))  # Mostrar el contenido HTML en lugar de guardarlo
 
-    html_content = pio.to_html(fig)  # Obtener el contenido HTML como cadena
-    print(html_content)  # Mostrar el contenido HTML en lugar de guardarlo
+# Función que genera el HTML de la animación como cadena
+def animation_html(frames, fast=False):
+    if fast:
+        return to_html(animation_figure_dict(frames), include_plotlyjs=plotlyjs_include())  # Mismo HTML, sin pasar por graph_objects
+
+    fig = go.Figure()  # Crear la figura para la animación
+
+    max_val = max(np.max(frame['arr']) for frame in frames)  # Encontrar el valor máximo en todos los frames para ajustar el eje Y
+
+    fig.add_trace(create_array_trace(frames[0]))  # Agregar la primera traza del arreglo
 
-# Crear un arreglo aleatorio y ejecutar el algoritmo
-arr = np.random.randint(1, 100, 9)  # Crear un arreglo de 9 números aleatorios entre 1 y 100
-frames = bucket_sort_with_animation(arr, num_buckets=5)  # Generar los frames de la animación
-create_animation(frames)  # Crear y mostrar la animación
+    fig_frames = []  # Lista de frames para la animación
+    for i, frame in enumerate(frames):
+        frame_data = [create_array_trace(frame)]  # Crear la traza para el frame actual
+        fig_frames.append(go.Frame(data=frame_data, name=str(i)))  # Añadir el frame a la animación
+
+    fig.frames = fig_frames  # Asignar los frames a la figura
+
+    # Configurar el layout y los controles de la animación
+    fig.update_layout(animation_layout(frames[-1], max_val))
+
+    return pio.to_html(fig, include_plotlyjs=plotlyjs_include())  # Obtener el contenido HTML como cadena
+
+# Versión en streaming de create_animation: escribe el HTML en fp (por defecto
+# stdout) frame a frame, sin guardar la lista de frames ni de go.Frame
+def create_animation_stream(frames, fp=None):
+    import sys
+
+    def layout(first_frame, last_frame, max_val):
+        return figure_dict([], animation_layout(last_frame, max_val))['layout']
+
+    write_html_stream(fp or sys.stdout, frames, array_trace_dict, layout,
+                      include_plotlyjs=plotlyjs_include())
+
+if __name__ == "__main__":
+    # Crear un arreglo aleatorio y ejecutar el algoritmo
+    arr = np.random.randint(1, 100, 9)  # Crear un arreglo de 9 números aleatorios entre 1 y 100
+    render_cache = get_cache()  # Cache de HTML ya generado (ver rendercache)
+    cache_id = cache_key('bucketsort2', arr, {'num_buckets': 5, 'plotlyjs': plotlyjs_include()})
+    html_content = render_cache.get(cache_id)
+    stats = SortStats('bucketsort2') if stats_enabled() else None  # Con SORT_STATS=1 se escriben en stderr
+    if html_content is None:
+        frames = bucket_sort_with_animation(arr, num_buckets=5, stats=stats)  # Generar los frames de la animación
+        with phase(stats, 'render'):
+            html_content = animation_html(frames).encode('utf-8')  # Crear la animación
+        render_cache.put(cache_id, html_content)
+    print(html_content.decode('utf-8'))  # Mostrar el contenido HTML
+    if stats is not None:
+        stats.cache = render_cache.stats()
+        stats.emit()
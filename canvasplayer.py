@@ -0,0 +1,181 @@
+import json
+
+# Reproductor HTML/JS ligero para una heapcore.HeapTrace: en lugar de un
+# frame de plotly por evento (valores, textos y colores de todo el array),
+# el HTML lleva solo el array inicial y el log de eventos (stage, i, j,
+# heap_size), y el navegador aplica los swaps y dibuja en un <canvas>. El
+# tamaño del archivo crece con el numero de swaps, no con swaps * n, y no
+# necesita plotly.js.
+
+PLAYER_TEMPLATE = '''<div class="heap-player" style="font-family: sans-serif; max-width: 1000px">
+<h3 style="margin: 8px 0">__TITLE__</h3>
+<canvas style="width: 100%; height: 540px; display: block"></canvas>
+<div style="display: flex; gap: 8px; align-items: center; margin-top: 8px">
+<button data-action="prev">&#9664;</button>
+<button data-action="play">Play</button>
+<button data-action="next">&#9654;</button>
+<input type="range" min="0" value="0" style="flex: 1">
+<select><option value="1">1x</option><option value="4">4x</option><option value="16">16x</option><option value="64">64x</option></select>
+<span style="min-width: 170px; text-align: right"></span>
+</div>
+</div>
+<script>
+(function () {
+  var data = __DATA__;
+  var colors = __COLORS__;
+  var root = document.currentScript.previousElementSibling;
+  var canvas = root.querySelector('canvas'), ctx = canvas.getContext('2d');
+  var slider = root.querySelector('input'), speed = root.querySelector('select');
+  var label = root.querySelector('span'), playButton = root.querySelector('[data-action=play]');
+  var events = data.events, n = data.initial.length, total = events.length / 4 + 1;
+  var arr = data.initial.slice(), pos = 0, timer = null;
+  // Copias del array cada `every` frames (como heapcore.HeapSession): al
+  // retroceder se reproduce desde el checkpoint anterior, no desde el frame 0
+  var every = Math.max(64, n), checkpoints = [data.initial.slice()];
+  // Un bucle y no Math.min.apply: con arrays grandes se pasa del limite de argumentos
+  var values = data.initial.concat(data.inserted), lo = 0, hi = 0;
+  for (var v = 0; v < values.length; v++) {
+    if (values[v] < lo) lo = values[v];
+    if (values[v] > hi) hi = values[v];
+  }
+  hi = hi * 1.1 || 1;
+  slider.max = total - 1;
+
+  function apply(k) {
+    var i = events[4 * k + 1], j = events[4 * k + 2];
+    if (data.stages[events[4 * k]] === 'insert') {
+      arr[i] = data.inserted[j];
+    } else {
+      var tmp = arr[i]; arr[i] = arr[j]; arr[j] = tmp;
+    }
+  }
+
+  function seek(frame) {
+    frame = Math.max(0, Math.min(total - 1, frame));
+    if (frame < pos) {
+      // Todo checkpoint anterior a pos ya se guardo al avanzar hasta pos
+      var c = Math.floor(frame / every);
+      arr = checkpoints[c].slice(); pos = c * every;
+    }
+    while (pos < frame) {
+      apply(pos); pos++;
+      if (pos % every === 0 && !checkpoints[pos / every]) checkpoints[pos / every] = arr.slice();
+    }
+    slider.value = pos;
+    draw();
+  }
+
+  function frameColors() {
+    // Mismos colores que heapplot.bar_trace_dict
+    var fill = new Array(n).fill(colors['default']);
+    if (pos === 0) return fill.fill(colors.active);
+    var k = 4 * (pos - 1), stage = data.stages[events[k]];
+    var current = events[k + 1], extracted = events[k + 2], heapSize = events[k + 3];
+    var color = stage === 'extract' ? colors.extracted : colors.active;
+    for (var a = 0; a < heapSize; a++) fill[a] = color;
+    if (stage === 'extract' && data.mark_extracted) fill[extracted] = color;
+    fill[current] = colors.current;
+    return fill;
+  }
+
+  function draw() {
+    var ratio = window.devicePixelRatio || 1;
+    var width = canvas.clientWidth, height = canvas.clientHeight;
+    if (canvas.width !== width * ratio || canvas.height !== height * ratio) {
+      canvas.width = width * ratio; canvas.height = height * ratio;
+    }
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, width, height);
+    var left = 50, bottom = 30, top = 20, plotWidth = width - left - 10, plotHeight = height - top - bottom;
+    var step = plotWidth / n, barWidth = Math.max(1, step * 0.8);
+    function y(value) { return top + plotHeight * (hi - value) / (hi - lo); }
+
+    ctx.strokeStyle = '#888'; ctx.fillStyle = '#444'; ctx.font = '11px sans-serif';
+    ctx.beginPath(); ctx.moveTo(left, y(0)); ctx.lineTo(left + plotWidth, y(0)); ctx.stroke();
+    ctx.textAlign = 'right'; ctx.fillText(String(Math.round(hi / 1.1)), left - 4, y(hi / 1.1) + 4);
+    ctx.fillText('0', left - 4, y(0) + 4);
+    ctx.textAlign = 'center'; ctx.fillText('Índice', left + plotWidth / 2, height - 8);
+
+    var fill = frameColors(), labels = step >= 14;
+    for (var a = 0; a < n; a++) {
+      var x = left + a * step + (step - barWidth) / 2, y0 = y(0), y1 = y(arr[a]);
+      ctx.fillStyle = fill[a];
+      ctx.fillRect(x, Math.min(y0, y1), barWidth, Math.abs(y1 - y0));
+      if (labels) {
+        ctx.fillStyle = '#444';
+        ctx.fillText(String(arr[a]), x + barWidth / 2, Math.min(y0, y1) - 3);
+      }
+    }
+    var stage = pos === 0 ? 'initial' : data.stages[events[4 * (pos - 1)]];
+    label.textContent = 'frame ' + pos + ' / ' + (total - 1) + ' (' + stage + ')';
+  }
+
+  function pause() { clearTimeout(timer); timer = null; playButton.textContent = 'Play'; }
+  function tick() {
+    // A mas de ~60 frames por segundo se avanzan varios frames por dibujo
+    var delay = __DURATION__ / Number(speed.value);
+    if (pos >= total - 1) { pause(); return; }
+    seek(pos + Math.max(1, Math.round(16 / delay)));
+    timer = setTimeout(tick, Math.max(16, delay));
+  }
+  function play() {
+    if (pos >= total - 1) seek(0);
+    playButton.textContent = 'Pause';
+    timer = setTimeout(tick, 0);
+  }
+
+  playButton.onclick = function () { timer ? pause() : play(); };
+  root.querySelector('[data-action=prev]').onclick = function () { pause(); seek(pos - 1); };
+  root.querySelector('[data-action=next]').onclick = function () { pause(); seek(pos + 1); };
+  slider.oninput = function () { pause(); seek(Number(slider.value)); };
+  window.addEventListener('resize', draw);
+  draw();
+})();
+</script>
+'''
+
+
+def player_data(trace):
+    """Datos que necesita el reproductor: array inicial y log de eventos."""
+    from heapcore import STAGES
+
+    return {
+        'initial': list(trace.initial),
+        'events': trace.events.tolist(),
+        'inserted': list(trace.inserted),
+        'stages': list(STAGES),
+        'mark_extracted': trace.mark_extracted,
+    }
+
+
+def _tolist(value):
+    # Valores de NumPy (heapsort.py ordena un np.ndarray)
+    return value.tolist()
+
+
+def _script_json(obj):
+    # JSON seguro dentro de <script>
+    return json.dumps(obj, separators=(',', ':'), default=_tolist).replace('</', '<\\/')
+
+
+def player_html(trace, color_map, title='Animación de Heap Sort', duration=500, full_html=True):
+    """HTML del reproductor de canvas para una HeapTrace.
+
+    trace tiene que ser la traza completa (heap_sort(arr, trace=True)), no
+    una lista de frames muestreados. color_map tiene las claves 'default',
+    'active', 'current' y 'extracted' (ver heapplot.COLOR_MAP); duration
+    es la duracion de un frame en ms a velocidad 1x, como en plotly.
+    """
+    html = (PLAYER_TEMPLATE
+            .replace('__TITLE__', title.replace('&', '&amp;').replace('<', '&lt;'))
+            .replace('__DATA__', _script_json(player_data(trace)))
+            .replace('__COLORS__', _script_json(color_map))
+            .replace('__DURATION__', str(int(duration))))
+    if full_html:
+        html = f'<html>\n<head><meta charset="utf-8" /></head>\n<body>\n{html}</body>\n</html>\n'
+    return html
+
+
+def write_player(trace, output_file, color_map, **kwargs):
+    with open(output_file, 'w', encoding='utf-8') as fp:
+        fp.write(player_html(trace, color_map, **kwargs))
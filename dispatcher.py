@@ -0,0 +1,148 @@
+import sys
+import os
+import json
+import time
+import importlib
+import contextlib
+from collections import deque
+
+# Proceso unico y persistente que atiende todas las operaciones de data.json.
+# Cada entrada del registro indica el modulo y la funcion que la resuelven;
+# el modulo se importa la primera vez que se usa, asi que una suma no carga
+# numpy ni plotly y las peticiones siguientes no pagan ninguna importacion.
+#
+# Protocolo (NDJSON por stdin/stdout, una peticion por linea):
+#   {"id": 1, "op": "Suma", "params": {"operands": [1, 2]}}
+#   -> {"id": 1, "op": "Suma", "result": 3.0, "ms": 0.01}
+# Operaciones especiales: "_ops" (registro) y "_stats" (latencias).
+#
+# Uso: python dispatcher.py [--registry data.json]
+
+REGISTRY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data.json')
+
+
+class OperationStats:
+    """Latencias de una operacion: totales y percentiles de las ultimas muestras."""
+
+    def __init__(self, window=1000):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.load_ms = None
+        self.recent = deque(maxlen=window)
+
+    def add(self, ms, error=False):
+        self.count += 1
+        self.errors += error
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.recent.append(ms)
+
+    def as_dict(self):
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'max_ms': self.max_ms,
+            'load_ms': self.load_ms,
+        }
+
+
+class Dispatcher:
+    def __init__(self, registry_file=REGISTRY_FILE):
+        with open(registry_file, encoding='utf-8') as fp:
+            self.registry = json.load(fp)
+        self._handlers = {}
+        self.stats = {op: OperationStats() for op in self.registry}
+
+    def handler(self, op):
+        # Importa el modulo de la operacion solo la primera vez
+        handler = self._handlers.get(op)
+        if handler is None:
+            entry = self.registry.get(op)
+            if entry is None:
+                raise KeyError(f"operación desconocida: {op!r}")
+            if not entry.get('module') or not entry.get('handler'):
+                raise KeyError(f"la operación {op!r} no tiene módulo en el registro")
+            start = time.perf_counter()
+            # Algunos scripts imprimen al importarse: stdout es del protocolo
+            with contextlib.redirect_stdout(sys.stderr):
+                module = importlib.import_module(entry['module'])
+            handler = getattr(module, entry['handler'])
+            self.stats[op].load_ms = (time.perf_counter() - start) * 1000
+            self._handlers[op] = handler
+        return handler
+
+    def dispatch(self, request):
+        """Resuelve una peticion (dict) y devuelve la respuesta (dict)."""
+        request_id = request.get('id')
+        op = request.get('op')
+        if not isinstance(op, str):
+            return {'id': request_id, 'op': None, 'error': f"Petición inválida: 'op' debe ser un texto, no {op!r}"}
+        if op == '_ops':
+            return {'id': request_id, 'op': op,
+                    'result': {key: entry.get('title', key) for key, entry in self.registry.items()}}
+        if op == '_stats':
+            return {'id': request_id, 'op': op, 'result': self.metrics()}
+
+        try:
+            handler = self.handler(op)
+        except KeyError as e:
+            return {'id': request_id, 'op': op, 'error': e.args[0]}
+
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                result = handler(**(request.get('params') or {}))
+            response = {'id': request_id, 'op': op, 'result': result}
+        except Exception as e:
+            response = {'id': request_id, 'op': op, 'error': f"{type(e).__name__}: {e}"}
+        ms = (time.perf_counter() - start) * 1000
+        self.stats[op].add(ms, 'error' in response)
+        response['ms'] = ms
+        return response
+
+    def metrics(self):
+        return {op: stats.as_dict() for op, stats in self.stats.items() if stats.count}
+
+    def serve(self, infile, outfile):
+        for line in infile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("se esperaba un objeto JSON")
+                response = self.dispatch(request)
+                encoded = json.dumps(response)
+            except ValueError as e:
+                encoded = json.dumps({'id': None, 'error': f"Petición inválida: {e}"})
+            except Exception as e:
+                # Ningun fallo de una peticion debe terminar el proceso
+                encoded = json.dumps({'id': None, 'error': f"{type(e).__name__}: {e}"})
+            outfile.write(encoded + '\n')
+            outfile.flush()
+
+
+def main(argv):
+    registry_file = REGISTRY_FILE
+    if len(argv) >= 2 and argv[0] == '--registry':
+        registry_file = argv[1]
+    dispatcher = Dispatcher(registry_file)
+    try:
+        dispatcher.serve(sys.stdin, sys.stdout)
+    finally:
+        # Resumen de latencias por operacion al terminar
+        print(json.dumps(dispatcher.metrics()), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+import functools
+
+# plotly.io se importa al usarlo: heapplot (y con el Heapsort2, que solo
+# genera datos) importa este modulo sin necesitar plotly
+
+
+@functools.lru_cache(maxsize=None)
+def default_template():
+    # El template que go.Figure aplicaria por defecto, ya como dict
+    import plotly.io as pio
+
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+def figure_dict(data, layout, frames=None):
+    """Figura de plotly como dict plano, sin pasar por graph_objects.
+
+    Equivale a go.Figure(data, layout, frames).to_plotly_json() pero sin la
+    validacion de propiedades, que domina el tiempo con cientos de frames.
+    Las trazas y layouts tienen que venir ya con los nombres normalizados
+    (marker=dict(color=...), title=dict(text=...), 'type': 'bar', ...).
+    """
+    layout = dict(layout)
+    layout.setdefault('template', default_template())
+    fig = {'data': data, 'layout': layout}
+    if frames is not None:
+        fig['frames'] = frames
+    return fig
+
+
+def to_html(fig, **kwargs):
+    # validate=False: plotly serializa el dict directamente con su encoder
+    # JSON mas rapido disponible (orjson si esta instalado)
+    import plotly.io as pio
+
+    return pio.to_html(fig, validate=False, **kwargs)
+
+
+def html_size(fig, **kwargs):
+    # Bytes del HTML de fig; con una figura sin frames mide lo fijo de la
+    # pagina (plotly.js si va incrustado, layout, template)
+    return len(to_html(fig, **kwargs).encode('utf-8'))
+
+
+def write_html(fig, file, **kwargs):
+    import plotly.io as pio
+
+    return pio.write_html(fig, file=file, validate=False, **kwargs)
@@ -0,0 +1,524 @@
+import itertools
+from array import array
+from collections import OrderedDict
+
+from heapengine import as_buffer
+from sortstats import phase
+
+STAGES = ('initial', 'heapify', 'extract', 'insert')
+STAGE_CODES = {stage: code for code, stage in enumerate(STAGES)}
+INSERT = STAGE_CODES['insert']
+
+
+def initial_frame(arr):
+    return {'arr': arr.copy(), 'stage': 'initial', 'active': list(range(len(arr)))}
+
+
+def event_frame(arr, stage, i, j, heap_size, mark_extracted=True):
+    active = list(range(heap_size))
+    if stage == 'extract' and mark_extracted:
+        active.append(j)
+    return {'arr': arr.copy(), 'stage': stage, 'active': active, 'current': i}
+
+
+class HeapTrace:
+    """Traza compacta de heap sort: array inicial + log de intercambios.
+
+    Cada evento ocupa 4 enteros (stage, i, j, heap_size) en un array.array,
+    asi que la memoria crece con el numero de swaps y no con swaps * n.
+    Los eventos 'insert' (top_k, merge_sorted) escriben un valor nuevo en
+    arr[i]; j es su posicion en la lista inserted. Los frames ({'arr',
+    'stage', 'active', 'current'}) se reconstruyen bajo demanda al iterar o
+    indexar.
+    """
+
+    def __init__(self, arr, mark_extracted=True):
+        # Los frames copian el array con .copy(); array.array y memoryview no
+        # lo tienen, asi que su estado inicial se guarda como lista
+        self.initial = arr.copy() if hasattr(arr, 'copy') else list(arr)
+        self.events = array('q')
+        self.inserted = []
+        # Si es True, los frames 'extract' marcan tambien la posicion extraida
+        self.mark_extracted = mark_extracted
+
+    def record(self, stage, i, j, heap_size):
+        self.events.extend((STAGE_CODES[stage], i, j, heap_size))
+
+    def insert(self, i, value, heap_size):
+        self.events.extend((STAGE_CODES['insert'], i, len(self.inserted), heap_size))
+        self.inserted.append(value)
+
+    def __len__(self):
+        return 1 + len(self.events) // 4
+
+    def _initial_frame(self):
+        return initial_frame(self.initial)
+
+    def _event_frame(self, arr, k):
+        stage, i, j, heap_size = self.events[4 * k:4 * k + 4]
+        return event_frame(arr, STAGES[stage], i, j, heap_size, self.mark_extracted)
+
+    def _apply(self, arr, k):
+        stage, i, j = self.events[4 * k:4 * k + 3]
+        if stage == INSERT:
+            arr[i] = self.inserted[j]
+        else:
+            arr[i], arr[j] = arr[j], arr[i]
+
+    def __iter__(self):
+        yield self._initial_frame()
+        arr = self.initial.copy()
+        for k in range(len(self) - 1):
+            self._apply(arr, k)
+            yield self._event_frame(arr, k)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('frame index out of range')
+        if index == 0:
+            return self._initial_frame()
+        arr = self.initial.copy()
+        for k in range(index):
+            self._apply(arr, k)
+        return self._event_frame(arr, index - 1)
+
+    def frames_at(self, indices):
+        """Frames en los indices dados (en orden creciente) con una sola pasada.
+
+        Solo se copia el array en los frames pedidos, asi que muestrear unos
+        pocos frames de una traza larga cuesta lo mismo que aplicar los swaps.
+        """
+        frames = []
+        arr = self.initial.copy()
+        applied = 0
+        for index in indices:
+            if index == 0:
+                frames.append(self._initial_frame())
+                continue
+            while applied < index:
+                self._apply(arr, applied)
+                applied += 1
+            frames.append(self._event_frame(arr, index - 1))
+        return frames
+
+    def frame_weights(self):
+        # Posiciones del array que cambian en cada frame: 2 por swap, 1 por insert
+        return [0] + [1 if stage == INSERT else 2 for stage in self.events[0::4]]
+
+    def phase_boundaries(self):
+        """Indices de frame que delimitan las fases (inicial, heapify, extract)."""
+        last = len(self) - 1
+        try:
+            first_extract = self.events[0::4].index(STAGE_CODES['extract']) + 1
+        except ValueError:
+            return [0, last]
+        return [0, first_extract - 1, first_extract, last]
+
+
+def max_value(frames):
+    """Mayor valor que aparece en frames (una HeapTrace o una lista de frames).
+
+    heap sort solo permuta el array, pero top_k y merge_sorted escriben
+    valores nuevos con eventos 'insert'; de una HeapTrace basta con mirar el
+    array inicial y esos valores, de una lista hay que recorrer los frames.
+    """
+    inserted = getattr(frames, 'inserted', None)
+    if inserted is not None:
+        return max(itertools.chain(frames.initial, inserted))
+    return max(max(frame['arr']) for frame in frames)
+
+
+class HeapSession:
+    """Acceso aleatorio a los frames de una HeapTrace con checkpoints.
+
+    Guarda una copia del array cada checkpoint_every eventos, asi que
+    frame(i) aplica como mucho checkpoint_every eventos desde el checkpoint
+    anterior en lugar de todos desde el principio, y la memoria extra es
+    O(n * eventos / checkpoint_every). Por defecto checkpoint_every es n
+    (minimo 64): materializar un frame ya copia n valores, asi que reproducir
+    hasta n eventos no cambia su coste y los checkpoints ocupan lo mismo que
+    el log. Los ultimos cache_size frames pedidos se guardan en un LRU; los
+    frames devueltos se comparten con el LRU y no deben modificarse.
+    """
+
+    def __init__(self, trace, checkpoint_every=None, cache_size=256):
+        if checkpoint_every is None:
+            checkpoint_every = max(64, len(trace.initial))
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every debe ser al menos 1")
+        self.trace = trace
+        self.checkpoint_every = checkpoint_every
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+        # checkpoints[c] es el array tras aplicar c * checkpoint_every eventos
+        self.checkpoints = [trace.initial]
+        arr = trace.initial.copy()
+        for k in range(len(trace) - 1):
+            if k and k % checkpoint_every == 0:
+                self.checkpoints.append(arr.copy())
+            trace._apply(arr, k)
+
+    def __len__(self):
+        return len(self.trace)
+
+    def __iter__(self):
+        return iter(self.trace)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self.frames(start, stop)
+            return [self.frame(k) for k in range(start, stop, step)]
+        return self.frame(index)
+
+    def frame(self, index):
+        """Frame index (admite indices negativos)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('frame index out of range')
+        frame = self._cache.get(index)
+        if frame is not None:
+            self.hits += 1
+            self._cache.move_to_end(index)
+            return frame
+        self.misses += 1
+        frame, = self._replay(index, index + 1)
+        self._remember(index, frame)
+        return frame
+
+    def frames(self, start, stop):
+        """Frames start..stop-1 con una sola reproduccion desde un checkpoint."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if all(k in self._cache for k in range(start, stop)):
+            return [self.frame(k) for k in range(start, stop)]
+        self.misses += max(0, stop - start)
+        frames = self._replay(start, stop)
+        for k, frame in enumerate(frames, start):
+            self._remember(k, frame)
+        return frames
+
+    def frames_at(self, indices):
+        return self.trace.frames_at(indices)
+
+    def frame_weights(self):
+        return self.trace.frame_weights()
+
+    def phase_boundaries(self):
+        return self.trace.phase_boundaries()
+
+    def _replay(self, start, stop):
+        # El frame k > 0 es el estado tras aplicar los eventos 0..k-1
+        frames = []
+        if start >= stop:
+            return frames
+        if start == 0:
+            frames.append(self.trace._initial_frame())
+            start = 1
+        if start >= stop:
+            return frames
+        checkpoint = (start - 1) // self.checkpoint_every
+        arr = self.checkpoints[checkpoint].copy()
+        for k in range(checkpoint * self.checkpoint_every, stop - 1):
+            self.trace._apply(arr, k)
+            if k + 1 >= start:
+                frames.append(self.trace._event_frame(arr, k))
+        return frames
+
+    def _remember(self, index, frame):
+        self._cache[index] = frame
+        self._cache.move_to_end(index)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def heap_sort_session(arr, checkpoint_every=None, cache_size=256, mark_extracted=True, stats=None):
+    """Ordena arr en su lugar y devuelve un HeapSession con sus frames."""
+    trace = heap_sort(arr, trace=HeapTrace(arr, mark_extracted), stats=stats)
+    return HeapSession(trace, checkpoint_every, cache_size)
+
+
+def sift_down(arr, n, i, trace=None, stage='heapify'):
+    """Version iterativa de heapify: hunde arr[i] dentro del heap arr[:n].
+
+    Devuelve la posicion final del elemento.
+    """
+    while True:
+        largest = i
+        l = 2 * i + 1
+        r = l + 1
+
+        if l < n and arr[l] > arr[largest]:
+            largest = l
+
+        if r < n and arr[r] > arr[largest]:
+            largest = r
+
+        if largest == i:
+            return i
+        arr[i], arr[largest] = arr[largest], arr[i]
+        if trace is not None:
+            trace.record(stage, i, largest, n)
+        i = largest
+
+
+def sift_down_min(arr, n, i, trace=None, stage='heapify'):
+    """Como sift_down, pero para un min-heap (la raiz es el menor)."""
+    while True:
+        smallest = i
+        l = 2 * i + 1
+        r = l + 1
+
+        if l < n and arr[l] < arr[smallest]:
+            smallest = l
+
+        if r < n and arr[r] < arr[smallest]:
+            smallest = r
+
+        if smallest == i:
+            return i
+        arr[i], arr[smallest] = arr[smallest], arr[i]
+        if trace is not None:
+            trace.record(stage, i, smallest, n)
+        i = smallest
+
+
+def count_sift(stats, n, start, end):
+    """Suma a stats el trabajo de un sift_down que llevo start hasta end.
+
+    El camino es unico (los ancestros de end hasta start), asi que las
+    comparaciones y los swaps se deducen de el sin contar dentro del bucle.
+    """
+    depth = 0
+    comparisons = 0
+    node = end
+    while True:
+        comparisons += (2 * node + 1 < n) + (2 * node + 2 < n)
+        if node == start:
+            break
+        node = (node - 1) // 2
+        depth += 1
+    stats.comparisons += comparisons
+    stats.swaps += depth
+    stats.sifts += 1
+    stats.sift_depth_total += depth
+    if depth > stats.max_sift_depth:
+        stats.max_sift_depth = depth
+
+
+def heap_sort(arr, trace=False, stats=None):
+    """Ordena arr en su lugar.
+
+    Con trace=False no se genera ningun frame y se devuelve arr. Con
+    trace=True (o pasando un HeapTrace ya creado) se devuelve la traza.
+    Con stats (un sortstats.SortStats) se cuentan comparaciones, swaps y
+    profundidad de los sift-downs y se miden las fases 'build_heap' y
+    'extract'.
+    """
+    if trace is True:
+        trace = HeapTrace(arr)
+    elif trace is False:
+        trace = None
+    n = len(arr)
+    # Los buffers tipados (ndarray, array.array) se ordenan a traves de un
+    # memoryview, sin crear un escalar de NumPy en cada acceso
+    buf = as_buffer(arr)
+
+    # Build the heap
+    with phase(stats, 'build_heap'):
+        for i in range(n // 2 - 1, -1, -1):
+            end = sift_down(buf, n, i, trace)
+            if stats is not None:
+                count_sift(stats, n, i, end)
+
+    # Extract elements from the heap
+    with phase(stats, 'extract'):
+        for i in range(n - 1, 0, -1):
+            buf[i], buf[0] = buf[0], buf[i]
+            if trace is not None:
+                trace.record('extract', 0, i, i)
+            end = sift_down(buf, i, 0, trace)
+            if stats is not None:
+                stats.swaps += 1
+                count_sift(stats, i, 0, end)
+
+    if stats is not None:
+        stats.algorithm = stats.algorithm or 'heap_sort'
+        stats.n += n
+        stats.frames += 0 if trace is None else len(trace)
+    return arr if trace is None else trace
+
+
+def top_k(iterable, k, trace=False):
+    """Los k mayores elementos de iterable, de mayor a menor.
+
+    Mantiene un min-heap con los k mayores vistos hasta el momento: cada
+    elemento nuevo solo entra (reemplazando a la raiz) si es mayor que el
+    menor de ellos. Es O(n log k) en tiempo y O(k) en memoria, e iterable
+    puede ser un iterador que se consume una sola vez.
+
+    Con trace=True devuelve un HeapTrace del heap de k posiciones, animable
+    con create_animation; su ultimo frame contiene el resultado.
+    """
+    it = iter(iterable)
+    heap = list(itertools.islice(it, k)) if k > 0 else []
+    trace = HeapTrace(heap) if trace is True else None
+    n = len(heap)
+
+    for i in range(n // 2 - 1, -1, -1):
+        sift_down_min(heap, n, i, trace)
+
+    if n:
+        for value in it:
+            if value > heap[0]:
+                heap[0] = value
+                if trace is not None:
+                    trace.insert(0, value, n)
+                sift_down_min(heap, n, 0, trace)
+
+    # Ordenar de mayor a menor llevando cada minimo al final
+    for i in range(n - 1, 0, -1):
+        heap[i], heap[0] = heap[0], heap[i]
+        if trace is not None:
+            trace.record('extract', 0, i, i)
+        sift_down_min(heap, i, 0, trace)
+
+    return heap if trace is None else trace
+
+
+def merge_sorted(*iterables, trace=None):
+    """Mezcla perezosa de iterables ya ordenados de menor a mayor.
+
+    Generador: mantiene un min-heap con la cabeza de cada iterable (como
+    tuplas (valor, indice del iterable), asi que los empates salen en el
+    orden de los iterables) y solo avanza el iterable cuyo valor acaba de
+    entregar. Cada elemento cuesta O(log k) para k iterables.
+
+    trace puede ser un HeapTrace vacio (HeapTrace([])): se rellena mientras
+    se consume el generador, con las primeras cabezas como array inicial,
+    y se anima con create_animation.
+    """
+    iterators = [iter(iterable) for iterable in iterables]
+    heap = []
+    for index, it in enumerate(iterators):
+        for value in it:
+            heap.append((value, index))
+            break
+    n = len(heap)
+    if trace is not None:
+        trace.initial = [value for value, _ in heap]
+
+    for i in range(n // 2 - 1, -1, -1):
+        sift_down_min(heap, n, i, trace)
+
+    while n:
+        value, index = heap[0]
+        yield value
+        for value in iterators[index]:
+            heap[0] = (value, index)
+            if trace is not None:
+                trace.insert(0, value, n)
+            break
+        else:
+            # Iterable agotado: su hueco lo ocupa la ultima cabeza del heap
+            n -= 1
+            heap[0], heap[n] = heap[n], heap[0]
+            if trace is not None:
+                trace.record('extract', 0, n, n)
+        sift_down_min(heap, n, 0, trace)
+
+
+def iter_heap_sort_frames(arr, mark_extracted=True):
+    """Generador: ordena arr en su lugar y va entregando cada frame al producirse.
+
+    Produce los mismos frames que heap_sort(arr, trace=True) pero sin
+    guardar nada, para que el consumidor pueda escribirlos mientras avanza
+    el ordenamiento.
+    """
+    n = len(arr)
+    yield initial_frame(arr)
+
+    for i in range(n // 2 - 1, -1, -1):
+        yield from _iter_sift_down(arr, n, i, mark_extracted)
+
+    for i in range(n - 1, 0, -1):
+        arr[i], arr[0] = arr[0], arr[i]
+        yield event_frame(arr, 'extract', 0, i, i, mark_extracted)
+        yield from _iter_sift_down(arr, i, 0, mark_extracted)
+
+
+def _iter_sift_down(arr, n, i, mark_extracted):
+    # Misma logica que sift_down, entregando un frame por swap
+    while True:
+        largest = i
+        l = 2 * i + 1
+        r = l + 1
+
+        if l < n and arr[l] > arr[largest]:
+            largest = l
+
+        if r < n and arr[r] > arr[largest]:
+            largest = r
+
+        if largest == i:
+            return
+        arr[i], arr[largest] = arr[largest], arr[i]
+        yield event_frame(arr, 'heapify', i, largest, n, mark_extracted)
+        i = largest
+
+
+def heap_sort_batch(rows):
+    """Ordena cada fila de un array 2-D de NumPy con sift-downs vectorizados.
+
+    Todas las filas avanzan juntas por las mismas fases del heap sort; en
+    cada nivel del sift-down solo siguen activas las filas que aun hacen
+    swap. Si rows ya es un ndarray se ordena en su lugar.
+    """
+    import numpy as np
+
+    rows = np.asarray(rows)
+    if rows.ndim != 2:
+        raise ValueError('heap_sort_batch espera un array 2-D (filas x n)')
+    m, n = rows.shape
+
+    for i in range(n // 2 - 1, -1, -1):
+        _sift_down_rows(rows, np.arange(m), n, i)
+
+    for i in range(n - 1, 0, -1):
+        rows[:, [0, i]] = rows[:, [i, 0]]
+        _sift_down_rows(rows, np.arange(m), i, 0)
+
+    return rows
+
+
+def _sift_down_rows(rows, live, n, start):
+    pos = live * 0 + start
+    while live.size:
+        left = 2 * pos + 1
+        keep = left < n
+        live, pos, left = live[keep], pos[keep], left[keep]
+        if not live.size:
+            return
+
+        child = left.copy()
+        has_right = left + 1 < n
+        right_rows = has_right.nonzero()[0]
+        right = left[right_rows] + 1
+        use_right = rows[live[right_rows], right] > rows[live[right_rows], left[right_rows]]
+        child[right_rows[use_right]] = right[use_right]
+
+        parent_val = rows[live, pos]
+        child_val = rows[live, child]
+        swap = child_val > parent_val
+        live, pos, child = live[swap], pos[swap], child[swap]
+        rows[live, pos] = child_val[swap]
+        rows[live, child] = parent_val[swap]
+        pos = child
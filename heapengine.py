@@ -0,0 +1,165 @@
+from sortstats import phase
+
+# Heap sort sobre buffers tipados (array.array, memoryview, arrays de NumPy)
+# sin convertirlos a lista: se ordena a traves de un memoryview del buffer,
+# cuyo indexado devuelve int/float de Python directamente (indexar un
+# ndarray elemento a elemento crea un escalar de NumPy en cada acceso).
+#
+# Variantes:
+#   'binary'     heap binario con sift-down por hueco (movimientos, no swaps)
+#   'quaternary' heap 4-ario: la mitad de niveles, hijos contiguos en memoria
+#   'bottom_up'  heap sort bottom-up de Floyd: baja hasta una hoja con una
+#                comparacion por nivel y sube el elemento desde ahi; hace
+#                cerca de n log2 n comparaciones en lugar de 2 n log2 n
+#
+# Cada sift devuelve sus comparaciones; contarlas en una variable local
+# cuesta poco y evita mantener dos versiones de cada variante.
+
+VARIANTS = ('binary', 'quaternary', 'bottom_up')
+
+
+def as_buffer(data):
+    """Vista escribible de data sin copiarla.
+
+    Los objetos con protocolo de buffer 1-D y escribibles (array.array,
+    bytearray, ndarray contiguo o con strides, memoryview) se devuelven como
+    memoryview; cualquier otra secuencia (listas, arrays de objetos de
+    NumPy, ...) se devuelve tal cual.
+    """
+    if isinstance(data, list):
+        return data
+    try:
+        view = memoryview(data)
+    except (TypeError, ValueError):
+        return data
+    if view.ndim != 1 or view.readonly:
+        return data
+    if len(view):
+        try:
+            view[0]
+        except NotImplementedError:
+            # Formatos sin indexado en memoryview (dtype object, otro endianness)
+            return data
+    return view
+
+
+def _sift_binary(a, start, end):
+    comparisons = 0
+    item = a[start]
+    i = start
+    child = 2 * i + 1
+    while child < end:
+        right = child + 1
+        if right < end:
+            comparisons += 1
+            if a[right] > a[child]:
+                child = right
+        comparisons += 1
+        value = a[child]
+        if not value > item:
+            break
+        a[i] = value
+        i = child
+        child = 2 * i + 1
+    a[i] = item
+    return comparisons
+
+
+def _sift_quaternary(a, start, end):
+    comparisons = 0
+    item = a[start]
+    i = start
+    first = 4 * i + 1
+    while first < end:
+        best = first
+        best_value = a[first]
+        if first + 3 < end:
+            # Caso comun, los cuatro hijos: desenrollado
+            value = a[first + 1]
+            if value > best_value:
+                best, best_value = first + 1, value
+            value = a[first + 2]
+            if value > best_value:
+                best, best_value = first + 2, value
+            value = a[first + 3]
+            if value > best_value:
+                best, best_value = first + 3, value
+            comparisons += 4
+        else:
+            for k in range(first + 1, end):
+                comparisons += 1
+                value = a[k]
+                if value > best_value:
+                    best, best_value = k, value
+            comparisons += 1
+        if not best_value > item:
+            break
+        a[i] = best_value
+        i = best
+        first = 4 * i + 1
+    a[i] = item
+    return comparisons
+
+
+def _sift_bottom_up(a, start, end):
+    comparisons = 0
+    item = a[start]
+    i = start
+    child = 2 * i + 1
+    # Bajar el hueco hasta una hoja subiendo siempre el hijo mayor
+    while child < end:
+        right = child + 1
+        if right < end:
+            comparisons += 1
+            if a[right] > a[child]:
+                child = right
+        a[i] = a[child]
+        i = child
+        child = 2 * i + 1
+    # Subir el elemento desde la hoja hasta su sitio (casi siempre 1-2 niveles)
+    while i > start:
+        parent = (i - 1) // 2
+        comparisons += 1
+        value = a[parent]
+        if not value < item:
+            break
+        a[i] = value
+        i = parent
+    a[i] = item
+    return comparisons
+
+
+_SIFTS = {'binary': (_sift_binary, 2), 'quaternary': (_sift_quaternary, 4),
+          'bottom_up': (_sift_bottom_up, 2)}
+
+
+def heap_sort_buffer(data, variant='binary', stats=None):
+    """Ordena data en su lugar con la variante dada y devuelve data.
+
+    data puede ser una lista, un array.array, un memoryview o un ndarray
+    1-D (ver as_buffer); nunca se convierte a lista. Con stats (un
+    sortstats.SortStats) se cuentan las comparaciones y se miden las fases
+    'build_heap' y 'extract'.
+    """
+    if variant not in _SIFTS:
+        raise ValueError(f"variante desconocida: {variant!r} (opciones: {', '.join(VARIANTS)})")
+    sift, arity = _SIFTS[variant]
+    a = as_buffer(data)
+    n = len(a)
+    comparisons = 0
+
+    with phase(stats, 'build_heap'):
+        for i in range((n - 2) // arity, -1, -1):
+            comparisons += sift(a, i, n)
+
+    with phase(stats, 'extract'):
+        for end in range(n - 1, 0, -1):
+            a[0], a[end] = a[end], a[0]
+            comparisons += sift(a, 0, end)
+
+    if stats is not None:
+        stats.algorithm = stats.algorithm or f'heap_sort_buffer[{variant}]'
+        stats.n += n
+        stats.comparisons += comparisons
+        stats.sifts += (n - 2) // arity + 1 + max(0, n - 1)
+    return data
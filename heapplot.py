@@ -0,0 +1,126 @@
+from animstream import write_html_stream
+from canvasplayer import write_player
+from fastfig import figure_dict, html_size
+from heapcore import HeapTrace, heap_sort, initial_frame, max_value
+from keyframes import json_size, sample_trace
+from plotlyasset import plotlyjs_include
+from sortstats import phase
+
+# Figura de plotly de la animacion de heap sort, comun a heapsort.py y
+# HeapSortSYS.py: colores, trazas de barras, layout y las salidas en
+# streaming y de canvas. Cada script conserva su create_animation (uno abre
+# el navegador y el otro no).
+
+COLOR_MAP = {
+    'default': 'rgb(173, 216, 230)',  # Light Blue
+    'active': 'rgb(144, 238, 144)',   # Light Green
+    'current': 'rgb(255, 99, 71)',    # Light Tomato
+    'extracted': 'rgb(255, 215, 0)'   # Light Golden Rod Yellow
+}
+
+
+def heap_sort_with_animation(arr, stats=None, max_frames=None, max_bytes=None, sampling='uniform',
+                             overhead=0, mark_extracted=True, frame_size=None):
+    """Ordena arr en su lugar y devuelve sus frames (una heapcore.HeapTrace).
+
+    stats: sortstats.SortStats opcional (comparaciones, swaps, tiempos por
+    fase). Con max_frames / max_bytes se devuelve solo una muestra de los
+    frames (sampling 'uniform' o 'weighted', ver keyframes.sample_trace);
+    overhead son los bytes fijos de la pagina que se descuentan de
+    max_bytes (ver page_overhead). frame_size estima los bytes de un frame
+    (por defecto el JSON de su traza de barras) y mark_extracted es el de
+    heapcore.HeapTrace.
+    """
+    trace = heap_sort(arr, trace=HeapTrace(arr, mark_extracted=mark_extracted), stats=stats)
+    if max_frames is None and max_bytes is None:
+        return trace
+    if frame_size is None:
+        frame_size = lambda frame: json_size(bar_trace_dict(frame))
+    return sample_trace(trace, max_frames, max_bytes, sampling, frame_size=frame_size,
+                        stats=stats, overhead=overhead)
+
+
+def bar_trace_dict(frame):
+    colors = [COLOR_MAP['default'] for _ in frame['arr']]
+    for i in frame['active']:
+        colors[i] = COLOR_MAP['active']
+    if frame['stage'] == 'extract':
+        for i in frame['active']:
+            colors[i] = COLOR_MAP['extracted']
+    if 'current' in frame:
+        colors[frame['current']] = COLOR_MAP['current']
+
+    return dict(
+        type='bar',
+        x=list(range(len(frame['arr']))),
+        y=frame['arr'],
+        marker=dict(color=colors),
+        text=[str(x) for x in frame['arr']],
+        textposition='outside',
+        hoverinfo='text'
+    )
+
+
+def create_bar_trace(frame):
+    import plotly.graph_objects as go
+
+    return go.Bar(bar_trace_dict(frame))
+
+
+def animation_layout(max_val):
+    return dict(
+        title=dict(text='Animación de Heap Sort'),
+        updatemenus=[dict(
+            type='buttons',
+            showactive=False,
+            buttons=[dict(label='Play',
+                          method='animate',
+                          args=[None, dict(frame=dict(duration=500, redraw=True),
+                                           fromcurrent=True,
+                                           mode='immediate')])],
+        )],
+        height=600,
+        xaxis=dict(title=dict(text='Índice')),
+        yaxis=dict(range=[0, max_val * 1.1], title=dict(text='Valor'))
+    )
+
+
+def animation_figure_dict(frames):
+    # Misma figura que create_animation de los scripts, construida con dicts planos
+    max_val = max_value(frames)
+    return figure_dict(
+        data=[bar_trace_dict(frames[0])],
+        layout=animation_layout(max_val),
+        frames=[{'data': [bar_trace_dict(frame)], 'name': str(i)} for i, frame in enumerate(frames)]
+    )
+
+
+def page_overhead(arr, include_plotlyjs=True):
+    """Bytes de la pagina que no dependen del numero de frames.
+
+    Incluye plotly.js si va incrustado (~4.8 MB), el layout, el template y
+    la traza inicial; se restan de un presupuesto de bytes para toda la
+    pagina. include_plotlyjs es el de to_html (ver plotlyasset.plotlyjs_include).
+    """
+    fig = figure_dict([bar_trace_dict(initial_frame(arr))], animation_layout(max(arr)))
+    return html_size(fig, include_plotlyjs=include_plotlyjs)
+
+
+def create_animation_stream(frames, output_file='heap_sort_animation.html'):
+    # Escribe el HTML frame a frame; acepta un generador como
+    # iter_heap_sort_frames para no tener nunca todos los frames en memoria
+    def layout(first_frame, last_frame, max_val):
+        return figure_dict([], animation_layout(max_val))['layout']
+
+    with open(output_file, 'w', encoding='utf-8') as fp:
+        write_html_stream(fp, frames, bar_trace_dict, layout,
+                          include_plotlyjs=plotlyjs_include(output_file))
+    print(f"La animación ha sido guardada en {output_file}")
+
+
+def create_animation_canvas(trace, output_file='heap_sort_animation.html', stats=None):
+    # Reproductor de canvas (ver canvasplayer): el HTML lleva el array inicial
+    # y el log de swaps en lugar de un frame de plotly por evento
+    with phase(stats, 'render'):
+        write_player(trace, output_file, COLOR_MAP)
+    print(f"La animación ha sido guardada en {output_file}")
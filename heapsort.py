@@ -2,127 +2,80 @@ import sys
 import plotly.graph_objects as go
 import numpy as np
 import plotly.io as pio
-
-def heapify(arr, n, i, frames):
-    largest = i
-    l = 2 * i + 1
-    r = 2 * i + 2
-
-    if l < n and arr[l] > arr[largest]:
-        largest = l
-
-    if r < n and arr[r] > arr[largest]:
-        largest = r
-
-    if largest != i:
-        arr[i], arr[largest] = arr[largest], arr[i]
-        frames.append({
-            'arr': arr.copy(),
-            'stage': 'heapify',
-            'active': list(range(n)),
-            'current': i
-        })
-        heapify(arr, n, largest, frames)
-
-def heap_sort_with_animation(arr):
-    n = len(arr)
-    frames = [{'arr': arr.copy(), 'stage': 'initial', 'active': list(range(n))}]
-
-    # Build the heap
-    for i in range(n // 2 - 1, -1, -1):
-        heapify(arr, n, i, frames)
-
-    # Extract elements from the heap
-    for i in range(n - 1, 0, -1):
-        arr[i], arr[0] = arr[0], arr[i]
-        frames.append({
-            'arr': arr.copy(),
-            'stage': 'extract',
-            'active': list(range(i)) + [i],
-            'current': 0
-        })
-        heapify(arr, i, 0, frames)
-
-    return frames
-
-def create_animation(frames, output_file):
-    fig = go.Figure()
-
-    max_val = max(max(frame['arr']) for frame in frames)
-
-    color_map = {
-        'default': 'rgb(173, 216, 230)',  # Light Blue
-        'active': 'rgb(144, 238, 144)',   # Light Green
-        'current': 'rgb(255, 99, 71)',    # Light Tomato
-        'extracted': 'rgb(255, 215, 0)'   # Light Golden Rod Yellow
-    }
-
-    def create_bar_trace(frame):
-        colors = [color_map['default'] for _ in frame['arr']]
-        for i in frame['active']:
-            colors[i] = color_map['active']
-        if frame['stage'] == 'extract':
-            for i in frame['active']:
-                colors[i] = color_map['extracted']
-        if 'current' in frame:
-            colors[frame['current']] = color_map['current']
-
-        return go.Bar(
-            x=list(range(len(frame['arr']))),
-            y=frame['arr'],
-            marker_color=colors,
-            text=[str(x) for x in frame['arr']],
-            textposition='outside',
-            hoverinfo='text'
-        )
-
-    fig.add_trace(create_bar_trace(frames[0]))
-    fig_frames = [go.Frame(data=[create_bar_trace(frame)], name=str(i)) 
-                  for i, frame in enumerate(frames)]
-    fig.frames = fig_frames
-
-    fig.update_layout(
-        title='Animación de Heap Sort',
-        updatemenus=[dict(
-            type='buttons',
-            showactive=False,
-            buttons=[dict(label='Play',
-                          method='animate',
-                          args=[None, dict(frame=dict(duration=500, redraw=True),
-                                           fromcurrent=True,
-                                           mode='immediate')])],
-        )],
-        height=600
-    )
-
-    fig.update_xaxes(title_text='Índice')
-    fig.update_yaxes(range=[0, max_val * 1.1], title_text='Valor')
-
-    pio.write_html(fig, file=output_file, auto_open=False, auto_play=False)
+from fastfig import write_html
+from plotlyasset import plotlyjs_include
+from heapcore import max_value, sift_down
+from heapplot import (animation_figure_dict, animation_layout, create_animation_canvas,
+                      create_bar_trace, heap_sort_with_animation, page_overhead)
+from keyframes import DEFAULT_MAX_BYTES, DEFAULT_MAX_FRAMES
+from sortstats import SortStats, phase, stats_enabled
+
+def heapify(arr, n, i, trace=None):
+    # trace: HeapTrace opcional donde se registran los intercambios
+    sift_down(arr, n, i, trace)
+
+def generate_random_array(size=10, low=1, high=100):
+    return np.random.randint(low, high, size)
+
+# Limite de main: con el presupuesto de frames (keyframes.DEFAULT_MAX_FRAMES
+# y DEFAULT_MAX_BYTES) el tamaño del HTML ya no depende del numero de swaps,
+# asi que el array puede ser mucho mayor
+MAX_SIZE = 5000
+
+def create_animation(frames, output_file, fast=False, stats=None):
+    with phase(stats, 'render'):
+        if fast:
+            write_html(animation_figure_dict(frames), output_file,
+                       include_plotlyjs=plotlyjs_include(output_file), auto_open=False, auto_play=False)
+        else:
+            fig = go.Figure()
+            max_val = max_value(frames)  # incluye los valores de eventos 'insert' (top_k)
+
+            fig.add_trace(create_bar_trace(frames[0]))
+            fig_frames = [go.Frame(data=[create_bar_trace(frame)], name=str(i)) 
+                          for i, frame in enumerate(frames)]
+            fig.frames = fig_frames
+
+            fig.update_layout(animation_layout(max_val))
+
+            pio.write_html(fig, file=output_file, include_plotlyjs=plotlyjs_include(output_file),
+                           auto_open=False, auto_play=False)
     print(f"Array inicial: {frames[0]['arr']}")
     print(f"Array ordenado: {frames[-1]['arr']}")
     return frames[0]['arr'], frames[-1]['arr']
 
 def main():
     print("Argumentos recibidos:", sys.argv)
+    # --canvas: reproductor de canvas, sin muestrear frames
+    canvas = '--canvas' in sys.argv
+    argv = [arg for arg in sys.argv if arg != '--canvas']
     # Obtener el tamaño del array desde los argumentos
     size = 10  # valor por defecto
-    if len(sys.argv) > 1 and sys.argv[1]:
+    if len(argv) > 1 and argv[1]:
         try:
-            size = int(sys.argv[1])
+            size = int(argv[1])
             # Limitar el tamaño para evitar problemas de rendimiento
-            size = min(max(size, 5), 50)  # Entre 5 y 50 elementos
+            size = min(max(size, 5), MAX_SIZE)  # Entre 5 y MAX_SIZE elementos
         except ValueError:
-            print("Error: El argumento debe ser un número entre 5 y 50")
+            print(f"Error: El argumento debe ser un número entre 5 y {MAX_SIZE}")
             return
 
     # Generar y ordenar el array
     arr = generate_random_array(size=size)
     print(f"Array original: {arr.tolist()}")
-    frames = heap_sort_with_animation(arr)
-    import sys
-    output_file = sys.argv[2] if len(sys.argv) > 2 else 'heap_sort_animation.html'
-    create_animation(frames, output_file)
+    stats = SortStats('heapsort') if stats_enabled() else None
+    output_file = argv[2] if len(argv) > 2 else 'heap_sort_animation.html'
+    if canvas:
+        create_animation_canvas(heap_sort_with_animation(arr, stats=stats), output_file, stats=stats)
+    else:
+        # DEFAULT_MAX_BYTES es el tamaño de toda la pagina: a los frames les
+        # queda lo que no ocupa la parte fija
+        frames = heap_sort_with_animation(arr, stats=stats, max_frames=DEFAULT_MAX_FRAMES,
+                                          max_bytes=DEFAULT_MAX_BYTES,
+                                          overhead=page_overhead(arr, plotlyjs_include(output_file)))
+        create_animation(frames, output_file, fast=True, stats=stats)
+    if stats is not None:
+        stats.emit()
 
     print(f"Array ordenado: {arr.tolist()}")
 
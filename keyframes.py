@@ -0,0 +1,90 @@
+import json
+
+from sortstats import phase
+
+# Modos de muestreo de sample_trace
+SAMPLING_MODES = ('uniform', 'weighted')
+
+# Presupuesto por defecto de una animacion (heapsort.py, animserver.py,
+# batchrender.py): sin el un heapsort de n=1000 ya da un HTML de ~300 MB.
+# DEFAULT_MAX_BYTES es el tamaño de toda la pagina, plotly.js incluido
+DEFAULT_MAX_FRAMES = 300
+DEFAULT_MAX_BYTES = 8 * 2 ** 20
+
+
+def _tolist(value):
+    # Para json.dumps: arrays y escalares de NumPy
+    return value.tolist()
+
+
+def json_size(obj):
+    """Bytes de obj serializado en JSON (acepta valores de NumPy)."""
+    return len(json.dumps(obj, default=_tolist))
+
+
+def sample_indices(weights, keep, budget, mode='uniform'):
+    """Indices ordenados de como mucho budget frames de len(weights).
+
+    Siempre se conservan los indices de keep (limites de fase); si budget es
+    menor que len(keep) el resultado tiene len(keep) frames. El resto se
+    reparte de forma uniforme por posicion ('uniform') o por el peso
+    acumulado de cada frame ('weighted': mas frames donde cambian mas
+    posiciones del array).
+    """
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"muestreo desconocido: {mode!r} (opciones: {', '.join(SAMPLING_MODES)})")
+    total = len(weights)
+    if budget >= total:
+        return list(range(total))
+    keep = {k for k in keep if 0 <= k < total}
+    remaining = budget - len(keep)
+    if remaining <= 0:
+        return sorted(keep)
+
+    # NumPy solo hace falta al muestrear: Heapsort2 importa este modulo y sus
+    # rutas JSON con listas no deben pagar la importacion de NumPy
+    import numpy as np
+
+    if mode == 'uniform':
+        candidates = np.linspace(0, total - 1, remaining + 2).round().astype(np.intp)[1:-1]
+    else:
+        cumulative = np.cumsum(weights)
+        targets = np.linspace(0, cumulative[-1], remaining + 2)[1:-1]
+        candidates = np.minimum(np.searchsorted(cumulative, targets), total - 1)
+    chosen = keep | set(candidates.tolist())
+
+    # Varios objetivos pueden caer en el mismo frame (un frame muy pesado):
+    # el hueco se rellena de forma uniforme con los frames no elegidos
+    if len(chosen) < budget:
+        rest = np.setdiff1d(np.arange(total), np.fromiter(chosen, dtype=np.intp))
+        fill = np.linspace(0, rest.size - 1, budget - len(chosen)).round().astype(np.intp)
+        chosen |= set(rest[fill].tolist())
+    return sorted(chosen)
+
+
+def sample_trace(trace, max_frames=None, max_bytes=None, mode='uniform', frame_size=json_size,
+                 stats=None, overhead=0):
+    """Subconjunto de los frames de una traza que cabe en un presupuesto.
+
+    trace es un heapcore.HeapTrace o un bucketcore.BucketTrace (cualquier
+    objeto con frame_weights, phase_boundaries y frames_at). El presupuesto
+    es max_frames frames y/o max_bytes bytes; para los bytes se estima el
+    tamaño de un frame con frame_size (por ejemplo, el JSON de la traza de
+    plotly que genera) sobre el primer y el ultimo frame. overhead son los
+    bytes fijos de la salida (la pagina sin frames, ver
+    heapplot.page_overhead) y se descuentan de max_bytes. Los limites de
+    fase se conservan siempre. Devuelve la lista de frames elegidos.
+    """
+    with phase(stats, 'sample'):
+        budget = len(trace)
+        if max_frames is not None:
+            budget = min(budget, max_frames)
+        if max_bytes is not None and len(trace):
+            size = max(frame_size(frame) for frame in trace.frames_at([0, len(trace) - 1]))
+            budget = min(budget, max(1, max(1, max_bytes - overhead) // max(size, 1)))
+
+        indices = sample_indices(trace.frame_weights(), trace.phase_boundaries(), budget, mode)
+        frames = trace.frames_at(indices)
+    if stats is not None:
+        stats.frames += len(frames) - len(trace)
+    return frames
@@ -0,0 +1,61 @@
+import functools
+import hashlib
+import os
+import tempfile
+
+# Directorio de assets por defecto cuando se activa el modo "slim"; si no se
+# indica ni asset_dir ni esta variable, plotly.js se incrusta como siempre
+ASSET_DIR_ENV = 'PLOTLY_ASSET_DIR'
+# URL base opcional con la que se sirve el directorio de assets
+ASSET_URL_ENV = 'PLOTLY_ASSET_URL'
+
+
+@functools.lru_cache(maxsize=None)
+def ensure_plotlyjs(asset_dir):
+    """Escribe plotly.js una sola vez en asset_dir y devuelve su ruta.
+
+    El nombre lleva la version de plotly y un hash del contenido
+    (plotly-<version>-<sha256[:12]>.min.js), asi que distintas versiones
+    conviven y un archivo ya escrito nunca cambia. La escritura es atomica
+    para que varios procesos puedan llamarla a la vez. No usa la red.
+    """
+    import plotly
+    from plotly.offline import get_plotlyjs
+
+    content = get_plotlyjs().encode('utf-8')
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    path = os.path.join(asset_dir, f'plotly-{plotly.__version__}-{digest}.min.js')
+    if not os.path.exists(path):
+        os.makedirs(asset_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=asset_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return path
+
+
+def plotlyjs_include(output_file=None, asset_dir=None, base_url=None):
+    """Valor para include_plotlyjs de pio.to_html / pio.write_html.
+
+    Sin directorio de assets devuelve True (plotly.js incrustado). Con
+    directorio, devuelve la referencia al asset compartido: base_url/<nombre>
+    si hay URL base, la ruta relativa al HTML si se conoce output_file, o
+    la ruta del asset en otro caso.
+    """
+    asset_dir = asset_dir or os.environ.get(ASSET_DIR_ENV)
+    if not asset_dir:
+        return True
+    path = ensure_plotlyjs(os.path.abspath(asset_dir))
+
+    base_url = base_url or os.environ.get(ASSET_URL_ENV)
+    if base_url:
+        return f"{base_url.rstrip('/')}/{os.path.basename(path)}"
+    if output_file:
+        start = os.path.dirname(os.path.abspath(output_file))
+        return os.path.relpath(path, start).replace(os.sep, '/')
+    return path
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Cambiar cuando cambie la salida de los renderers para invalidar la cache
+RENDERER_VERSION = '1'
+
+# Configuracion por entorno de la cache compartida (get_cache)
+CACHE_DIR_ENV = 'RENDER_CACHE_DIR'
+CACHE_MAX_BYTES_ENV = 'RENDER_CACHE_MAX_BYTES'
+CACHE_MEMORY_BYTES_ENV = 'RENDER_CACHE_MEMORY_BYTES'
+
+
+def cache_key(algorithm, arr, params=None, version=RENDERER_VERSION):
+    """Hash de (algoritmo, array de entrada, parametros, version del renderer)."""
+    values = arr.tolist() if hasattr(arr, 'tolist') else list(arr)
+    payload = json.dumps([algorithm, values, params or {}, version],
+                         sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """Cache de artefactos (trazas, JSON, HTML) en memoria y en disco.
+
+    Los valores son bytes. Ambas capas son LRU con limite de tamaño en
+    bytes; en disco el orden LRU es el mtime de cada archivo, que se
+    actualiza en cada acierto. Las escrituras en disco son atomicas
+    (archivo temporal + os.replace), asi que varios workers pueden compartir
+    el mismo directorio.
+    """
+
+    def __init__(self, directory=None, max_bytes=512 * 2 ** 20, memory_bytes=64 * 2 ** 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+                       'memory_evictions': 0, 'disk_evictions': 0}
+        self._disk_size = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._stats['memory_hits'] += 1
+                return data
+
+        if self.directory:
+            path = self._path(key)
+            try:
+                with open(path, 'rb') as fp:
+                    data = fp.read()
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                # Solo actualiza el orden LRU: si otro proceso acaba de
+                # desalojar el archivo, los bytes leidos siguen siendo validos
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                self._remember(key, data)
+                return data
+
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, key, data):
+        self._remember(key, data)
+        if self.directory:
+            self._write(key, data)
+
+    def get_or_create(self, key, build):
+        # build() se llama solo si no hay acierto y debe devolver bytes
+        data = self.get(key)
+        if data is None:
+            data = build()
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_items'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_size
+        hits = stats['memory_hits'] + stats['disk_hits']
+        total = hits + stats['misses']
+        stats['hit_rate'] = hits / total if total else 0.0
+        return stats
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old)
+            self._memory[key] = data
+            self._memory_size += len(data)
+            while self._memory_size > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+                self._stats['memory_evictions'] += 1
+
+    def _write(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_size += len(data)
+            over = self._disk_size > self.max_bytes
+        if over:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _evict_disk(self):
+        # Otros procesos pueden estar escribiendo o borrando a la vez: se
+        # recalcula el tamaño real y se ignoran los archivos que desaparecen.
+        # Se baja hasta el 90% del limite para no recorrer el directorio en
+        # cada escritura.
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = 0.9 * self.max_bytes
+        evicted = 0
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        with self._lock:
+            self._disk_size = total
+            self._stats['disk_evictions'] += evicted
+
+
+_shared_cache = None
+
+
+def get_cache():
+    """Cache compartida del proceso, configurada por variables de entorno.
+
+    Siempre tiene capa en memoria; la capa en disco solo se activa si
+    RENDER_CACHE_DIR esta definida.
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        kwargs = {}
+        if os.environ.get(CACHE_MAX_BYTES_ENV):
+            kwargs['max_bytes'] = int(os.environ[CACHE_MAX_BYTES_ENV])
+        if os.environ.get(CACHE_MEMORY_BYTES_ENV):
+            kwargs['memory_bytes'] = int(os.environ[CACHE_MEMORY_BYTES_ENV])
+        _shared_cache = RenderCache(os.environ.get(CACHE_DIR_ENV), **kwargs)
+    return _shared_cache
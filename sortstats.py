@@ -0,0 +1,84 @@
+import contextlib
+import json
+import os
+import sys
+import time
+
+# Si esta variable esta definida (y no es '0'), los scripts escriben sus
+# estadisticas como una linea JSON en stderr
+STATS_ENV = 'SORT_STATS'
+
+
+class SortStats:
+    """Contadores y tiempos por fase de un ordenamiento instrumentado.
+
+    Se pasa como stats= a heap_sort, bucket_sort, bucket_sort_trace, etc.;
+    sin stats esas funciones no miden nada. Los tiempos se acumulan por
+    nombre de fase ('build_heap', 'extract', 'distribute', 'combine',
+    'render', 'serialize', ...) en segundos.
+
+    bucket sort no cuenta comparaciones ni swaps: ocurren dentro de NumPy.
+    """
+
+    # Por encima de este numero de buckets as_dict() solo incluye el resumen
+    MAX_REPORTED_BUCKETS = 256
+
+    def __init__(self, algorithm=None):
+        self.algorithm = algorithm
+        self.n = 0
+        self.comparisons = 0
+        self.swaps = 0
+        self.sifts = 0
+        self.sift_depth_total = 0
+        self.max_sift_depth = 0
+        self.frames = 0
+        self.bucket_sizes = None
+        self.phases = {}
+        # Estadisticas de la cache de render (rendercache.RenderCache.stats)
+        self.cache = None
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        from bucketcore import bucket_occupancy
+
+        stats = {
+            'algorithm': self.algorithm,
+            'n': self.n,
+            'comparisons': self.comparisons,
+            'swaps': self.swaps,
+            'sifts': self.sifts,
+            'max_sift_depth': self.max_sift_depth,
+            'mean_sift_depth': self.sift_depth_total / self.sifts if self.sifts else 0.0,
+            'frames': self.frames,
+            'phases': dict(self.phases),
+            'total_seconds': sum(self.phases.values()),
+        }
+        if self.bucket_sizes is not None:
+            stats['buckets'] = bucket_occupancy(self.bucket_sizes)
+            if len(self.bucket_sizes) <= self.MAX_REPORTED_BUCKETS:
+                stats['bucket_sizes'] = list(self.bucket_sizes)
+        if self.cache is not None:
+            stats['cache'] = self.cache
+        return stats
+
+    def emit(self, fp=None):
+        """Escribe las estadisticas como una linea JSON (en stderr por defecto)."""
+        fp = sys.stderr if fp is None else fp
+        fp.write(json.dumps(self.as_dict()) + '\n')
+        fp.flush()
+
+
+def phase(stats, name):
+    # stats.phase(name) o un contexto vacio si no se esta midiendo
+    return contextlib.nullcontext() if stats is None else stats.phase(name)
+
+
+def stats_enabled():
+    return os.environ.get(STATS_ENV, '0') not in ('', '0')
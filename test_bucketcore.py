@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from bucketcore import STRATEGIES, bucket_sort, bucket_sort_file, bucket_sort_parallel
+
+
+# Arreglos constantes o de un solo elemento: min == max en todas las estrategias
+@pytest.mark.parametrize('strategy', STRATEGIES)
+@pytest.mark.parametrize('arr', [np.full(10, 7.0), np.array([5.0, 5.0, 5.0]), np.array([3.0])])
+def test_constant_input(strategy, arr):
+    assert bucket_sort(arr.copy(), num_buckets=4, strategy=strategy).tolist() == arr.tolist()
+
+
+@pytest.mark.parametrize('strategy', STRATEGIES)
+def test_constant_input_parallel(strategy):
+    arr = np.full(1000, 7.0)
+    assert bucket_sort_parallel(arr, workers=2, num_buckets=4, strategy=strategy).tolist() == arr.tolist()
+
+
+# Enteros de rango completo: la normalizacion min-max no debe desbordarse
+@pytest.mark.parametrize('strategy', STRATEGIES)
+@pytest.mark.parametrize('arr', [
+    np.random.default_rng(0).integers(-2 ** 31, 2 ** 31 - 1, 10000, dtype=np.int32),
+    np.random.default_rng(0).integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, 10000, dtype=np.int64),
+    np.array([-100, 100, 0, -100, 50], dtype=np.int8),
+])
+def test_full_range_integers(strategy, arr):
+    assert bucket_sort(arr, num_buckets=8, strategy=strategy).tolist() == np.sort(arr).tolist()
+
+
+def test_full_range_integers_parallel():
+    arr = np.random.default_rng(0).integers(-2 ** 31, 2 ** 31 - 1, 10000, dtype=np.int32)
+    assert bucket_sort_parallel(arr, workers=2, num_buckets=8).tolist() == np.sort(arr).tolist()
+
+
+def test_full_range_integers_file(tmp_path):
+    arr = np.random.default_rng(0).integers(-2 ** 31, 2 ** 31 - 1, 10000, dtype=np.int32)
+    arr.tofile(tmp_path / 'in.bin')
+    bucket_sort_file(tmp_path / 'in.bin', tmp_path / 'out.bin', dtype=np.int32, memory_bytes=8192)
+    assert np.fromfile(tmp_path / 'out.bin', dtype=np.int32).tolist() == np.sort(arr).tolist()
+
+
+# Los NaN van al ultimo bucket y quedan al final, como en np.sort
+@pytest.mark.parametrize('arr', [
+    np.array([3.0, np.nan, 1.0, 2.0, np.nan]),
+    np.array([5.0, np.nan, 5.0]),
+    np.array([np.nan, np.nan]),
+])
+def test_nan_input(arr):
+    expected = np.sort(arr)
+    np.testing.assert_array_equal(bucket_sort(arr, num_buckets=4), expected)
+    np.testing.assert_array_equal(bucket_sort_parallel(arr, workers=2, num_buckets=4), expected)
+
+
+def test_nan_input_file(tmp_path):
+    arr = np.random.default_rng(0).random(5000)
+    arr[::7] = np.nan
+    arr.tofile(tmp_path / 'in.bin')
+    bucket_sort_file(tmp_path / 'in.bin', tmp_path / 'out.bin', memory_bytes=8192)
+    np.testing.assert_array_equal(np.fromfile(tmp_path / 'out.bin'), np.sort(arr))
@@ -0,0 +1,106 @@
+import heapq
+import itertools
+import random
+
+import pytest
+
+from heapcore import HeapSession, HeapTrace, heap_sort, heap_sort_session, merge_sorted, top_k
+
+
+def _values(n, seed=0):
+    rng = random.Random(seed)
+    return [rng.randint(-50, 50) for _ in range(n)]
+
+
+# HeapSession: cada frame debe coincidir con la reproduccion completa de la traza
+@pytest.mark.parametrize('checkpoint_every', [None, 1, 3, 7, 64])
+@pytest.mark.parametrize('n', [1, 2, 9, 40])
+def test_session_frame(checkpoint_every, n):
+    arr = _values(n)
+    expected = list(heap_sort(arr[:], trace=True))
+    session = heap_sort_session(arr[:], checkpoint_every, cache_size=4)
+    assert len(session) == len(expected)
+    order = list(range(len(expected)))
+    random.Random(1).shuffle(order)
+    for k in order:
+        assert session.frame(k) == expected[k]
+        assert session.frame(k - len(expected)) == expected[k]
+
+
+@pytest.mark.parametrize('checkpoint_every', [None, 1, 5])
+def test_session_frames(checkpoint_every):
+    expected = list(heap_sort(_values(30), trace=True))
+    session = heap_sort_session(_values(30), checkpoint_every, cache_size=8)
+    rng = random.Random(2)
+    for _ in range(50):
+        start = rng.randrange(len(expected) + 1)
+        stop = rng.randrange(start, len(expected) + 2)
+        assert session.frames(start, stop) == expected[start:stop]
+    assert session[3:20:4] == expected[3:20:4]
+    assert session[-5:] == expected[-5:]
+
+
+def test_session_mark_extracted():
+    expected = list(heap_sort(_values(20), trace=HeapTrace(_values(20), mark_extracted=False)))
+    session = heap_sort_session(_values(20), checkpoint_every=4, mark_extracted=False)
+    assert session.frames(0, len(session)) == expected
+
+
+def test_session_cache():
+    session = heap_sort_session(_values(20), checkpoint_every=4, cache_size=2)
+    session.frame(10)
+    session.frame(10)
+    assert (session.hits, session.misses) == (1, 1)
+    # La LRU solo guarda cache_size frames
+    session.frame(11)
+    session.frame(12)
+    session.frame(10)
+    assert session.misses == 4
+
+
+def test_session_out_of_range():
+    session = heap_sort_session(_values(5))
+    with pytest.raises(IndexError):
+        session.frame(len(session))
+    with pytest.raises(IndexError):
+        session.frame(-len(session) - 1)
+    with pytest.raises(ValueError):
+        HeapSession(session.trace, checkpoint_every=0)
+
+
+# top_k y merge_sorted frente a heapq
+@pytest.mark.parametrize('k', [0, 1, 3, 10, 50, 80])
+@pytest.mark.parametrize('n', [0, 1, 10, 50])
+def test_top_k(k, n):
+    values = _values(n, seed=k)
+    assert top_k(iter(values), k) == heapq.nlargest(k, values)
+
+
+def test_top_k_trace():
+    values = _values(60)
+    trace = top_k(values, 8, trace=True)
+    assert trace[-1]['arr'] == heapq.nlargest(8, values)
+
+
+@pytest.mark.parametrize('sizes', [[], [0], [5], [3, 0, 4], [10, 10, 10], [1, 20, 0, 7, 7]])
+def test_merge_sorted(sizes):
+    rng = random.Random(len(sizes))
+    iterables = [sorted(rng.randint(0, 9) for _ in range(size)) for size in sizes]
+    expected = list(heapq.merge(*iterables))
+    assert list(merge_sorted(*(iter(values) for values in iterables))) == expected
+
+
+def test_merge_sorted_is_lazy():
+    def numbers(start):
+        yield from itertools.count(start, 2)
+
+    merged = merge_sorted(numbers(0), numbers(1))
+    assert list(itertools.islice(merged, 6)) == [0, 1, 2, 3, 4, 5]
+
+
+def test_merge_sorted_trace():
+    iterables = [[1, 4, 9], [2, 3], [0, 8]]
+    trace = HeapTrace([])
+    assert list(merge_sorted(*iterables, trace=trace)) == list(heapq.merge(*iterables))
+    assert trace.initial == [1, 2, 0]
+    assert len(trace) > 1
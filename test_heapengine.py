@@ -0,0 +1,69 @@
+from array import array
+
+import numpy as np
+import pytest
+
+from heapengine import VARIANTS, heap_sort_buffer
+from sortstats import SortStats
+
+
+def _values(n, seed=0):
+    return np.random.default_rng(seed).integers(-1000, 1000, n).tolist()
+
+
+# Cada variante sobre listas, buffers tipados, memoryview y ndarray con strides
+@pytest.mark.parametrize('variant', VARIANTS)
+@pytest.mark.parametrize('n', [0, 1, 2, 3, 4, 5, 17, 200])
+def test_list(variant, n):
+    values = _values(n)
+    assert heap_sort_buffer(values[:], variant) == sorted(values)
+
+
+@pytest.mark.parametrize('variant', VARIANTS)
+@pytest.mark.parametrize('typecode', ['q', 'i', 'd'])
+def test_array(variant, typecode):
+    data = array(typecode, _values(200))
+    result = heap_sort_buffer(data, variant)
+    assert result is data
+    assert data.tolist() == sorted(_values(200))
+
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_memoryview(variant):
+    data = array('q', _values(200))
+    heap_sort_buffer(memoryview(data), variant)
+    assert data.tolist() == sorted(_values(200))
+
+
+@pytest.mark.parametrize('variant', VARIANTS)
+@pytest.mark.parametrize('dtype', [np.int64, np.int32, np.float64])
+def test_strided_ndarray(variant, dtype):
+    base = np.array(_values(400), dtype=dtype)
+    view = base[::2]
+    expected = sorted(view.tolist())
+    rest = base[1::2].tolist()
+    heap_sort_buffer(view, variant)
+    assert view.tolist() == expected
+    # Solo se ordena la vista: los elementos intermedios no se tocan
+    assert base[1::2].tolist() == rest
+
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_duplicates(variant):
+    values = np.random.default_rng(1).integers(0, 4, 300).tolist()
+    assert heap_sort_buffer(values[:], variant) == sorted(values)
+
+
+def test_bottom_up_comparisons():
+    # Bottom-up hace bastantes menos comparaciones que el heap binario
+    counts = {}
+    for variant in ('binary', 'bottom_up'):
+        stats = SortStats()
+        heap_sort_buffer(_values(2000), variant, stats=stats)
+        counts[variant] = stats.comparisons
+    assert counts['bottom_up'] < counts['binary']
+
+
+def test_unknown_variant():
+    with pytest.raises(ValueError):
+        heap_sort_buffer([3, 1, 2], 'ternary')
@@ -0,0 +1,85 @@
+import io
+import json
+import random
+
+import pytest
+
+import Heapsort2
+from Heapsort2 import (PALETTE, binary_animation_data, compact_animation_data,
+                       decode_binary_animation_data, frame_data, generate_animation_data,
+                       heap_sort_with_animation, write_animation_data)
+
+
+def _frames(values, **budget):
+    return list(heap_sort_with_animation(list(values), **budget))
+
+
+def _values(n, low=-50, high=50, seed=0):
+    rng = random.Random(seed)
+    return [rng.randint(low, high) for _ in range(n)]
+
+
+ARRAYS = [[7], [2, 1], _values(10), _values(40, 0, 200), _values(30, -2 ** 40, 2 ** 40),
+          _values(20, -2 ** 63, 2 ** 63 - 1)]
+
+
+# El formato binario se decodifica a lo mismo que el compacto
+@pytest.mark.parametrize('values', ARRAYS)
+def test_binary_round_trip(values):
+    frames = _frames(values)
+    assert decode_binary_animation_data(binary_animation_data(frames)) == compact_animation_data(frames)
+
+
+def test_binary_round_trip_sampled():
+    frames = _frames(_values(200), max_frames=25)
+    assert decode_binary_animation_data(binary_animation_data(frames)) == compact_animation_data(frames)
+
+
+# Aplicar los deltas del formato compacto reconstruye los frames json
+@pytest.mark.parametrize('values', ARRAYS)
+def test_compact_matches_json(values):
+    frames = _frames(values)
+    compact = json.loads(generate_animation_data(frames, 'compact'))
+    y, codes = compact['y'], compact['c']
+    rebuilt = [{'x': compact['x'], 'y': y[:], 'colors': [compact['palette'][c] for c in codes]}]
+    for frame in compact['frames']:
+        for i, v in zip(frame['dy'][0::2], frame['dy'][1::2]):
+            y[i] = v
+        for i, c in zip(frame['dc'][0::2], frame['dc'][1::2]):
+            codes[i] = c
+        rebuilt.append({'x': compact['x'], 'y': y[:], 'colors': [PALETTE[c] for c in codes]})
+    assert rebuilt == json.loads(generate_animation_data(frames))
+    assert rebuilt == [frame_data(frame) for frame in frames]
+
+
+def test_stream_matches_json():
+    frames = _frames(_values(25))
+    fp = io.StringIO()
+    write_animation_data(iter(frames), fp)
+    assert fp.getvalue() == generate_animation_data(frames)
+
+
+def test_binary_out_of_range():
+    with pytest.raises(ValueError):
+        binary_animation_data(_frames([2 ** 63, 1]))
+
+
+# Peticiones del worker: validacion y el id en los errores
+@pytest.mark.parametrize('request_', [
+    {'id': 1, 'arr': '321'},
+    {'id': 1, 'arr': [True, 2]},
+    {'id': 1, 'arr': [1.5, 2]},
+    {'id': 1, 'arr': [2 ** 63, 1], 'format': 'binary'},
+    {'id': 1, 'arr': [3, 1], 'format': 'xml'},
+])
+def test_invalid_request(request_):
+    response = json.loads(Heapsort2.handle_request(json.dumps(request_)))
+    assert response['id'] == 1
+    assert response['error'].startswith('Petición inválida')
+
+
+def test_request_formats():
+    for data_format in ('json', 'compact', 'binary'):
+        response = json.loads(Heapsort2.handle_request(
+            json.dumps({'id': data_format, 'arr': [3, 1, 2], 'format': data_format})))
+        assert response['id'] == data_format and 'error' not in response